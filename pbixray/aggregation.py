@@ -0,0 +1,147 @@
+# ---------- IMPORTS ----------
+import numpy as np
+import pandas as pd
+from .utils import AGGREGATIONS
+from .vertipaq_decoder import fixed_decimal_values
+
+# ---------- RUN MERGING ----------
+
+def merge_runs(run_ends_list):
+    """Merges the run boundaries of several columns into segments over which every column is constant.
+
+    Returns the segment lengths and, per column, the index of the run covering each segment.
+    """
+    row_count = min((int(ends[-1]) if len(ends) else 0 for ends in run_ends_list), default=0)
+    ends = np.unique(np.concatenate([np.minimum(ends, row_count) for ends in run_ends_list])) if run_ends_list else np.zeros(0, dtype=np.int64)
+    ends = ends[ends > 0]
+    lengths = np.diff(ends, prepend=0)
+    return lengths, [np.searchsorted(run_ends, ends, side='left') for run_ends in run_ends_list]
+
+def _group_index(group_codes, segment_count):
+    """Numbers the distinct combinations of group codes (-1 for nulls).
+
+    Returns the group of each segment, the number of groups and the codes of each group per column.
+    """
+    if not group_codes:
+        return np.zeros(segment_count, dtype=np.int64), 1, []
+    shifted = [codes + 1 for codes in group_codes]
+    dims = [int(codes.max()) + 1 if len(codes) else 1 for codes in shifted]
+    if np.prod(dims, dtype=float) < 2**62:
+        distinct, groups = np.unique(np.ravel_multi_index(shifted, dims), return_inverse=True)
+        keys = np.unravel_index(distinct, dims)
+    else:
+        distinct, groups = np.unique(np.stack(shifted, axis=1), axis=0, return_inverse=True)
+        keys = distinct.T
+    return groups.ravel(), len(distinct), [np.asarray(key, dtype=np.int64) - 1 for key in keys]
+
+# ---------- AGGREGATIONS ----------
+
+def _numeric_values(values, column_name):
+    """Distinct values of a column as a numpy array that can be summed."""
+    if pd.api.types.is_bool_dtype(values.dtype):
+        return values.to_numpy(dtype=np.int64, na_value=0)
+    if not pd.api.types.is_numeric_dtype(values.dtype):
+        raise ValueError(f"Cannot SUM column {column_name} of type {values.dtype}.")
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return values.to_numpy(dtype=np.int64, na_value=0)
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+def _sum(values, codes, lengths, groups, group_count, column_name):
+    """Sums value * run length per group; integers are summed exactly, floats through np.bincount."""
+    numbers = _numeric_values(values, column_name)
+    valid = codes >= 0
+    weighted = numbers[codes[valid]] * lengths[valid]
+    if weighted.dtype.kind == 'f':
+        return pd.Series(np.bincount(groups[valid], weights=weighted, minlength=group_count))
+    totals = np.zeros(group_count, dtype=np.int64)
+    if len(weighted):
+        order = np.argsort(groups[valid], kind='stable')
+        sorted_groups = groups[valid][order]
+        starts = np.flatnonzero(np.diff(sorted_groups, prepend=-1))
+        totals[sorted_groups[starts]] = np.add.reduceat(weighted[order], starts)
+    return pd.Series(totals)
+
+def _extreme(values, codes, groups, group_count, function):
+    """MIN or MAX per group, computed on the ranks of the distinct values and looked up once per group."""
+    order = np.asarray(values.argsort(), dtype=np.int64)
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    valid = codes >= 0
+    if function == 'MIN':
+        best = np.full(group_count, len(order), dtype=np.int64)
+        np.minimum.at(best, groups[valid], ranks[codes[valid]])
+        missing = best == len(order)
+    else:
+        best = np.full(group_count, -1, dtype=np.int64)
+        np.maximum.at(best, groups[valid], ranks[codes[valid]])
+        missing = best == -1
+    if not len(order):
+        return _take(values, np.full(group_count, -1))
+    return _take(values, np.where(missing, -1, order[np.clip(best, 0, len(order) - 1)]))
+
+def _distinct_count(codes, value_count, lengths, groups, group_count):
+    """Number of distinct values per group; like DAX DISTINCTCOUNT, a blank counts as a value."""
+    present = lengths > 0
+    # One integer key per (group, code) pair, nulls (-1) shifted to 0
+    pairs = np.unique(groups[present] * (value_count + 1) + codes[present] + 1)
+    return pd.Series(np.bincount(pairs // (value_count + 1), minlength=group_count))
+
+def _take(values, positions):
+    """Looks distinct values up by position, -1 giving a null."""
+    return pd.Series(values.array.take(positions, allow_fill=True))
+
+def _normalize_aggs(aggs):
+    """Validates aggs given as {output name: (column, function)}, upper-casing the functions."""
+    normalized = {}
+    for name, spec in (aggs or {}).items():
+        if not isinstance(spec, (tuple, list)) or len(spec) != 2:
+            raise ValueError(f"Aggregation '{name}' must be a (column, function) tuple, got {spec!r}.")
+        column_name, function = spec
+        function = str(function).upper()
+        if function not in AGGREGATIONS:
+            raise ValueError(f"Unsupported aggregation '{spec[1]}'. Expected one of {AGGREGATIONS}.")
+        normalized[name] = (column_name, function)
+    return normalized
+
+def aggregate(decoder, table_name, group_by=None, aggs=None, decimal_mode='fixed'):
+    """Groups a table by columns and aggregates others, working on runs of DataIDs.
+
+    Run boundaries of all involved columns are merged so every column is constant over each
+    segment; segments are grouped by their dictionary codes and run lengths act as weights.
+    Dictionaries are only read for the group labels and the values being aggregated.
+    """
+    decoder._check_decimal_mode(decimal_mode)
+    group_by = [group_by] if isinstance(group_by, str) else list(group_by or [])
+    aggs = _normalize_aggs(aggs)
+    clashes = sorted(set(group_by) & set(aggs))
+    if clashes:
+        raise ValueError(f"Aggregation names {clashes} clash with group_by columns.")
+
+    column_names = list(dict.fromkeys(group_by + [column_name for column_name, _ in aggs.values()]))
+    plans = {plan.column_name: plan for plan in decoder.get_column_plans(table_name, column_names)}
+    # Aggregates are computed on scaled fixed decimals and converted to the decimal mode at the end
+    run_codes = {name: decoder.get_run_codes(table_name, name, 'fixed') for name in column_names}
+    lengths, run_indexes = merge_runs([run_codes[name][2] for name in column_names])
+    segment_codes = {name: run_codes[name][1][index] for name, index in zip(column_names, run_indexes)}
+    groups, group_count, group_keys = _group_index([segment_codes[name] for name in group_by], len(lengths))
+
+    def output(values, column_name):
+        return fixed_decimal_values(values, decimal_mode) if plans[column_name].data_type == 10 else values
+
+    result = {}
+    for name, keys in zip(group_by, group_keys):
+        result[name] = output(_take(run_codes[name][0], keys), name)
+    for name, (column_name, function) in aggs.items():
+        values, codes = run_codes[column_name][0], segment_codes[column_name]
+        if function == 'COUNT':
+            result[name] = pd.Series(np.bincount(groups[codes >= 0], weights=lengths[codes >= 0], minlength=group_count).astype(np.int64))
+        elif function == 'SUM':
+            result[name] = output(_sum(values, codes, lengths, groups, group_count, column_name), column_name)
+        elif function in ('MIN', 'MAX'):
+            result[name] = output(_extreme(values, codes, groups, group_count, function), column_name)
+        else:
+            result[name] = _distinct_count(codes, len(values), lengths, groups, group_count)
+    table = pd.DataFrame({name: series.reset_index(drop=True) for name, series in result.items()})
+    if group_by:
+        table = table.sort_values(group_by, na_position='last', ignore_index=True)
+    return table
@@ -0,0 +1,84 @@
+# ---------- IMPORTS ----------
+import numpy as np
+from .utils import import_optional, smallest_int_dtype
+
+# Fixed decimals (currency) as Arrow decimals: 19 digits, 4 of them after the decimal point
+CURRENCY_PRECISION = 19
+CURRENCY_DIGITS = 4
+
+# ---------- ARROW HELPERS ----------
+
+def _validity_buffer(pa, mask):
+    """Packs a boolean null mask into an Arrow validity bitmap (None when there are no nulls)."""
+    if mask is None or not mask.any():
+        return None, 0
+    return pa.py_buffer(np.packbits(~mask, bitorder='little')), int(mask.sum())
+
+def fixed_decimal_to_arrow(scaled, mask=None):
+    """Builds an Arrow decimal128(19,4) array from int64 values scaled by 10^4 without per-row objects."""
+    pa = import_optional('pyarrow', 'Arrow decimal output')
+    scaled = np.ascontiguousarray(scaled, dtype=np.int64)
+    # decimal128 is stored as 16-byte little-endian two's complement: low word + sign extension
+    words = np.empty((len(scaled), 2), dtype=np.int64)
+    words[:, 0] = scaled
+    words[:, 1] = scaled >> 63
+    validity, null_count = _validity_buffer(pa, mask)
+    return pa.Array.from_buffers(pa.decimal128(CURRENCY_PRECISION, CURRENCY_DIGITS), len(scaled), [validity, pa.py_buffer(words)], null_count=null_count)
+
+def to_arrow(values, value_type=None):
+    """Converts typed pandas values to an Arrow array; masked values become the validity bitmap.
+
+    value_type fixes the Arrow type instead of inferring it from the values.
+    """
+    pa = import_optional('pyarrow', 'Arrow output')
+    return pa.Array.from_pandas(values, type=value_type)
+
+def dictionary_array(positions, validity, dictionary):
+    """Builds an Arrow DictionaryArray from dictionary positions (codes), a validity mask and the Arrow dictionary.
+
+    Codes are stored in the narrowest signed index type and handed to Arrow as a buffer, nulls as a bitmap.
+    """
+    pa = import_optional('pyarrow', 'Arrow output')
+    codes = positions.astype(smallest_int_dtype(len(dictionary)))
+    mask = None if validity is None else ~validity
+    if mask is not None:
+        # Null slots still need an in-range code
+        codes[mask] = 0
+    validity_buffer, null_count = _validity_buffer(pa, mask)
+    indices = pa.Array.from_buffers(pa.from_numpy_dtype(codes.dtype), len(codes), [validity_buffer, pa.py_buffer(codes)], null_count=null_count)
+    return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+def run_end_encoded_array(run_ends, values):
+    """Builds an Arrow RunEndEncodedArray from cumulative run ends and one value per run."""
+    pa = import_optional('pyarrow', 'Arrow output')
+    run_end_type = pa.int32() if len(run_ends) == 0 or run_ends[-1] <= np.iinfo(np.int32).max else pa.int64()
+    return pa.RunEndEncodedArray.from_arrays(pa.array(run_ends, type=run_end_type), values)
+
+def value_arrow_type(plan, decimal_mode='fixed', dictionary_type=None):
+    """Arrow type of a column's values, derived from its AMO data type without reading any data.
+
+    Fixed decimals are decimal128(19,4) unless kept scaled ('fixed'); decimal.Decimal values are
+    converted to that type too. Columns of unmapped data types hold (DataID + BaseId) / Magnitude
+    (float64) when value-encoded, or the values of their dictionary, whose dictionary_type
+    ('string', 'long' or 'real', from the dictionary header) defaults to strings.
+    """
+    pa = import_optional('pyarrow', 'Arrow output')
+    value_types = {2: pa.string(), 6: pa.int64(), 8: pa.float64(), 9: pa.timestamp('ns'), 11: pa.bool_(), 17: pa.binary()}
+    dictionary_value_types = {'string': pa.string(), 'long': pa.int64(), 'real': pa.float64()}
+    if plan.data_type == 10:
+        return pa.int64() if decimal_mode == 'fixed' else pa.decimal128(CURRENCY_PRECISION, CURRENCY_DIGITS)
+    if plan.data_type in value_types:
+        return value_types[plan.data_type]
+    if not plan.is_dictionary_encoded:
+        return pa.float64()
+    return dictionary_value_types.get(dictionary_type, pa.string())
+
+def arrow_type(plan, decimal_mode='fixed', dictionary_type=None):
+    """Arrow type a column decodes to, derived from its AMO data type without reading any data.
+
+    Dictionary-encoded columns are reported as dictionary<int32, value type>; the decoded batches
+    use the narrowest index type and need a cast to match.
+    """
+    pa = import_optional('pyarrow', 'Arrow output')
+    value_type = value_arrow_type(plan, decimal_mode, dictionary_type)
+    return pa.dictionary(pa.int32(), value_type) if plan.is_dictionary_encoded else value_type
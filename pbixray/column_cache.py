@@ -0,0 +1,138 @@
+# ---------- IMPORTS ----------
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+# ---------- CACHE CLASSES ----------
+
+@dataclass
+class CacheEntryStats:
+    """Bookkeeping for one cached dictionary or column."""
+    kind: str  # 'dictionary' or 'column'
+    table_name: str
+    column_name: str
+    nbytes: int
+    hits: int = 0
+    created: float = 0.0
+    last_access: float = 0.0
+
+class ColumnCache:
+    """Size-bounded LRU cache of decoded dictionaries and expanded columns.
+
+    Entries are evicted least recently used first once the byte budget is exceeded. Cached
+    columns are handed out read-only when they are backed by a numpy array, otherwise a copy is
+    returned, so callers mutating a result can never corrupt the cache.
+    """
+    def __init__(self, max_bytes:int):
+        if max_bytes < 0:
+            raise ValueError("Cache budget must be a non-negative number of bytes.")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._stats = {}
+        self._nbytes = 0
+        self._lock = threading.RLock()
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Returns the cached value for key (read-only or copied), or None on a miss."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            entry_stats = self._stats[key]
+            entry_stats.hits += 1
+            entry_stats.last_access = time.time()
+            self.hits += 1
+            value, copy_on_read = self._entries[key]
+        return _read(value, copy_on_read)
+
+    def put(self, key, value, nbytes:int):
+        """Caches value under key (kind, table name, column name, ...) and returns what get would return.
+
+        Values larger than the whole budget are returned as they are without being cached.
+        """
+        if nbytes > self.max_bytes:
+            return value
+        value, copy_on_read = _freeze(value)
+        now = time.time()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, copy_on_read)
+            self._stats[key] = CacheEntryStats(key[0], key[1], key[2], nbytes, created=now, last_access=now)
+            self._nbytes += nbytes
+            while self._nbytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return _read(value, copy_on_read)
+
+    def invalidate(self, table_name=None, column_name=None):
+        """Drops the entries of a column, of a table, or everything when no table is given."""
+        with self._lock:
+            for key in list(self._entries):
+                if table_name is not None and key[1] != table_name:
+                    continue
+                if column_name is not None and key[2] != column_name:
+                    continue
+                self._remove(key)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self):
+        """Returns one row per cached entry, most recently used last."""
+        with self._lock:
+            rows = [
+                {
+                    'Kind': s.kind,
+                    'TableName': s.table_name,
+                    'ColumnName': s.column_name,
+                    'Bytes': s.nbytes,
+                    'Hits': s.hits,
+                    'Created': pd.Timestamp(s.created, unit='s'),
+                    'LastAccess': pd.Timestamp(s.last_access, unit='s'),
+                }
+                for s in (self._stats[key] for key in self._entries)
+            ]
+        return pd.DataFrame(rows, columns=['Kind', 'TableName', 'ColumnName', 'Bytes', 'Hits', 'Created', 'LastAccess'])
+
+    def _remove(self, key):
+        del self._entries[key]
+        self._nbytes -= self._stats.pop(key).nbytes
+
+# ---------- HELPERS ----------
+
+def _freeze(value):
+    """Makes a cached value immutable, returning it with a flag telling whether reads must copy."""
+    if isinstance(value, pd.Series) and isinstance(value.dtype, np.dtype):
+        data = value.to_numpy(copy=False).view()
+        data.flags.writeable = False
+        return pd.Series(data, index=value.index, name=value.name, copy=False), False
+    if isinstance(value, np.ndarray):
+        value = value.view()
+        value.flags.writeable = False
+        return value, False
+    # Extension arrays (masked, Arrow, ...) cannot be locked reliably: copy on every read instead
+    return value, True
+
+def _read(value, copy_on_read):
+    """Hands out a cached value: a fresh copy, or a new object sharing the read-only data."""
+    if copy_on_read:
+        return value.copy()
+    return value.view() if isinstance(value, np.ndarray) else value.copy(deep=False)
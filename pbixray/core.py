@@ -2,22 +2,134 @@
 
 from .pbix_unpacker import PbixUnpacker
 from .vertipaq_decoder import VertiPaqDecoder
+from .column_cache import ColumnCache
+from .parquet_export import export_parquet
+from .aggregation import aggregate
+from .profiling import profile
+from .storage_stats import storage_stats
+from .memory_report import memory_report
+from .polars_output import arrow_to_polars, scan_table
+from .duckdb_integration import query, register_tables
+from .sqlite_tables import register_tables as register_sqlite_tables
 from .meta.metadata_handler import MetadataHandler
-from .utils import WINDOWS_EPOCH_START
+from .utils import WINDOWS_EPOCH_START, get_data_slice
+import apsw
 import datetime
 
 # ---------- MAIN CLASS ----------
 
 class PBIXRay:
-    def __init__(self, file_path):
+    def __init__(self, file_path, cache_bytes=None, memory_budget=None, over_budget='raise'):
+        """Opens a PBIX or XLSX file, optionally with a decoded-column cache and a memory budget for get_table."""
         unpacker = PbixUnpacker(file_path)
         
+        self._data_model = unpacker.data_model
         self._metadata_handler = MetadataHandler(unpacker.data_model)
-        self._vertipaq_decoder = VertiPaqDecoder(self._metadata_handler.metadata, unpacker.data_model)
-        
-    def get_table(self, table_name):
+        self._vertipaq_decoder = VertiPaqDecoder(self._metadata_handler.metadata, unpacker.data_model, cache_bytes=cache_bytes, memory_budget=memory_budget, over_budget=over_budget)
+
+    def _table_names(self, tables):
+        """All tables for None, a single table name as a list, otherwise the given names."""
+        if tables is None:
+            return self.tables
+        return [tables] if isinstance(tables, str) else tables
+
+    def get_table(self, table_name, columns=None, offset=0, limit=None, decimal_mode='fixed', max_workers=None, executor='thread', dtype_backend='numpy_nullable', filters=None):
         """Generates a DataFrame representation of the specified table."""
-        return self._vertipaq_decoder.get_table(table_name)
+        return self._vertipaq_decoder.get_table(table_name, columns=columns, offset=offset, limit=limit, decimal_mode=decimal_mode, max_workers=max_workers, executor=executor, dtype_backend=dtype_backend, filters=filters)
+
+    def get_table_arrow(self, table_name, columns=None, offset=0, limit=None, decimal_mode='fixed', run_end_encoded=False):
+        """Generates a pyarrow.Table of the specified table (requires pyarrow)."""
+        return self._vertipaq_decoder.get_table_arrow(table_name, columns=columns, offset=offset, limit=limit, decimal_mode=decimal_mode, run_end_encoded=run_end_encoded)
+
+    def get_table_polars(self, table_name, columns=None, offset=0, limit=None, decimal_mode='fixed', use_enum=False):
+        """Generates a polars DataFrame of the specified table (requires polars and pyarrow)."""
+        return arrow_to_polars(self.get_table_arrow(table_name, columns=columns, offset=offset, limit=limit, decimal_mode=decimal_mode), use_enum)
+
+    def scan_table(self, table_name, batch_rows=100_000, decimal_mode='fixed', use_enum=False):
+        """Returns a polars LazyFrame over the specified table, decoding only the selected columns and rows."""
+        return scan_table(self._vertipaq_decoder, table_name, batch_rows=batch_rows, decimal_mode=decimal_mode, use_enum=use_enum)
+
+    def iter_table(self, table_name, batch_rows=100_000, columns=None, decimal_mode='fixed', output='pandas', dtype_backend='numpy_nullable'):
+        """Iterates over a table in DataFrames (or pyarrow RecordBatches) of batch_rows rows."""
+        return self._vertipaq_decoder.iter_table(table_name, batch_rows=batch_rows, columns=columns, decimal_mode=decimal_mode, output=output, dtype_backend=dtype_backend)
+
+    def export_parquet(self, path, tables=None, columns=None, row_group_rows=1_000_000, max_workers=None, decimal_mode='fixed'):
+        """Exports tables (all by default) to <path>/<table>.parquet and returns a dict of table name to file path."""
+        return export_parquet(self._vertipaq_decoder, path, self._table_names(tables), columns=columns, row_group_rows=row_group_rows, max_workers=max_workers, decimal_mode=decimal_mode)
+
+    def register_duckdb(self, connection=None, tables=None, batch_rows=100_000, decimal_mode='fixed'):
+        """Registers tables (all by default) as DuckDB views over lazily decoded datasets and returns the connection."""
+        return register_tables(self._vertipaq_decoder, self._table_names(tables), connection, batch_rows=batch_rows, decimal_mode=decimal_mode)
+
+    def sql(self, query_text, connection=None, batch_rows=100_000, decimal_mode='fixed'):
+        """Runs a DuckDB SQL query over the model tables and returns the DuckDB relation."""
+        return query(self._vertipaq_decoder, list(self.tables), query_text, connection, batch_rows=batch_rows, decimal_mode=decimal_mode)
+
+    def sqlite_connection(self, tables=None):
+        """Returns an apsw connection holding the model metadata in 'main' and the tables (all by default) in 'data'."""
+        connection = apsw.Connection(":memory:")
+        if self._data_model.file_type != "xlsx":
+            connection.deserialize("main", get_data_slice(self._data_model, 'metadata.sqlitedb'))
+        return register_sqlite_tables(connection, self._vertipaq_decoder, self._table_names(tables))
+
+    def aggregate(self, table_name, group_by=None, aggs=None, decimal_mode='fixed'):
+        """Groups a table and computes COUNT, SUM, MIN, MAX or DISTINCTCOUNT aggregates on the compressed data."""
+        return aggregate(self._vertipaq_decoder, table_name, group_by=group_by, aggs=aggs, decimal_mode=decimal_mode)
+
+    def profile(self, table=None, columns=None, top_k=5, max_workers=None):
+        """Profiles the columns of a table (or of the whole model) from run lengths and bit packed codes."""
+        if columns is not None and table is None:
+            raise ValueError("Pass a table to profile specific columns.")
+        schema_df = self._metadata_handler.metadata.schema_df
+        tables = self.tables if table is None else [table]
+        columns_by_table = {
+            table_name: list(columns) if columns is not None else list(schema_df.loc[schema_df['TableName'] == table_name, 'ColumnName'])
+            for table_name in tables
+        }
+        return profile(self._vertipaq_decoder, columns_by_table, top_k=top_k, max_workers=max_workers)
+
+    def storage_stats(self, table=None, max_workers=None):
+        """Storage-level statistics of each column segment of a table (or of the whole model)."""
+        schema_df = self._metadata_handler.metadata.schema_df
+        if table is not None:
+            if table not in self.tables:
+                raise ValueError(f"Table '{table}' not found. Available tables: {list(self.tables)}.")
+            schema_df = schema_df[schema_df['TableName'] == table]
+        return storage_stats(self._vertipaq_decoder, schema_df, max_workers=max_workers)
+
+    def memory_report(self, level='column'):
+        """Breaks the model size down by table, column (or other object) and structure kind at level 'file', 'column' or 'table'."""
+        metadata = self._metadata_handler.metadata
+        # Calculated and measure tables may have no columns in the schema
+        table_names = [name for df in (metadata.schema_df, metadata.dax_tables_df, metadata.dax_measures_df) if 'TableName' in df for name in df['TableName']]
+        return memory_report(self._data_model.file_log, metadata.schema_df, table_names, level=level)
+
+    def get_distinct(self, table_name, column_name, sort=False, decimal_mode='fixed'):
+        """Returns a column's distinct values, reading only its dictionary (or hash index for value-encoded columns).
+
+        Values come in DataID order, or ascending with sort=True. The column data itself is never read.
+        """
+        return self._vertipaq_decoder.get_distinct(table_name, column_name, sort=sort, decimal_mode=decimal_mode)
+
+    def lookup(self, table_name, column_name, value, decimal_mode='fixed'):
+        """Returns the positions of the rows where a column equals value, as a numpy array.
+
+        Value-encoded columns probe their hash index first, so absent values never touch the column data.
+        """
+        return self._vertipaq_decoder.lookup(table_name, column_name, value, decimal_mode=decimal_mode)
+
+    def estimate_memory(self, table_name, columns=None, dtype_backend='numpy_nullable', decimal_mode='fixed'):
+        """Estimates the memory get_table would need for a table, one row per column, without decoding anything."""
+        return self._vertipaq_decoder.estimate_memory(table_name, columns=columns, decimal_mode=decimal_mode, dtype_backend=dtype_backend)
+
+    def head(self, table_name, n=5, columns=None):
+        """Returns the first n rows of a table, decoding only those rows."""
+        return self.get_table(table_name, columns=columns, limit=n)
+
+    def clear_cache(self, table_name=None, column_name=None):
+        """Invalidates cached data of a column, of a table, or of the whole model."""
+        if self._vertipaq_decoder.cache is not None:
+            self._vertipaq_decoder.cache.invalidate(table_name, column_name)
 
     # ---------- PROPERTIES ----------
 
@@ -25,6 +137,12 @@ class PBIXRay:
     def tables(self):
         return self._metadata_handler.tables
     
+    @property
+    def cache_stats(self):
+        """Per-entry statistics of the decoded-column cache (empty when caching is off)."""
+        cache = self._vertipaq_decoder.cache
+        return cache.stats() if cache is not None else ColumnCache(0).stats()
+
     @property
     def statistics(self):
         return self._metadata_handler.stats
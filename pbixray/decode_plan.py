@@ -0,0 +1,110 @@
+# ---------- IMPORTS ----------
+from dataclasses import dataclass
+from typing import Optional
+from .abf.data_model import DataModel
+from .utils import AMO_PANDAS_TYPE_MAPPING, read_file_prefix, read_file_range
+
+# ---------- DECODE PLAN CLASSES ----------
+
+@dataclass(frozen=True)
+class FileSlice:
+    """Resolved location of a file inside the decompressed data model."""
+    file_name: str
+    offset: int
+    size: int
+    size_from_log: int
+
+    @classmethod
+    def from_file_ref(cls, file_ref:dict):
+        return cls(file_ref['FileName'], file_ref['m_cbOffsetHeader'], file_ref['Size'], file_ref['SizeFromLog'])
+
+    def read(self, data_model:DataModel) -> bytes:
+        """Reads (and decompresses if needed) the file contents."""
+        return read_file_range(data_model, self.file_name, self.offset, self.size, self.size_from_log)
+
+    def read_prefix(self, data_model:DataModel, length:int) -> bytes:
+        """Reads only the first length bytes of the file (e.g. a header)."""
+        return read_file_prefix(data_model, self.offset, self.size, length)
+
+@dataclass(frozen=True)
+class ColumnDecodePlan:
+    """Everything needed to decode a column, resolved once per model."""
+    table_name: str
+    column_name: str
+    data_type: object
+    pandas_dtype: str
+    encoding: str  # 'dictionary' or 'value'
+    idf: FileSlice
+    dictionary: Optional[FileSlice]
+    hidx: Optional[FileSlice]
+    min_data_id: int
+    max_data_id: int
+    bit_width: int
+    count_bit_packed: int
+    row_count: int
+    base_id: float
+    magnitude: float
+    is_nullable: bool
+    has_nulls: bool = False
+
+    @property
+    def is_dictionary_encoded(self):
+        return self.encoding == 'dictionary'
+
+    @property
+    def bit_packed_min_data_id(self):
+        """DataID that bit packed code 0 maps to.
+
+        Shifted by one to the null DataID for nullable dictionary columns, and for value-encoded
+        columns whose segment statistics record nulls.
+        """
+        if (self.is_dictionary_encoded and self.is_nullable) or (not self.is_dictionary_encoded and self.has_nulls):
+            return self.min_data_id - 1
+        return self.min_data_id
+
+    @property
+    def data_size(self):
+        """Size in bytes of the column's files, used to schedule the largest columns first."""
+        return sum(f.size for f in (self.idf, self.dictionary, self.hidx) if f is not None)
+
+# ---------- PLAN BUILDER ----------
+
+def build_column_plan(column_metadata, file_index:dict, idfmeta) -> ColumnDecodePlan:
+    """Builds a decode plan from a schema row, an index of the file log and the parsed .idfmeta."""
+    def file_slice(file_name):
+        if not isinstance(file_name, str) or not file_name:
+            return None
+        file_ref = file_index.get(file_name)
+        if not file_ref:
+            raise ValueError(f"File reference not found for filename: {file_name}.")
+        return FileSlice.from_file_ref(file_ref)
+
+    dictionary = file_slice(column_metadata["Dictionary"])
+    hidx = file_slice(column_metadata["HIDX"])
+    if dictionary is not None:
+        encoding = 'dictionary'
+    elif hidx is not None:
+        encoding = 'value'
+    else:
+        raise ValueError(f"Neither dictionary nor hidx found for column {column_metadata['ColumnName']} in table.")
+
+    cs = idfmeta.blocks.cp.cs
+    return ColumnDecodePlan(
+        table_name=column_metadata["TableName"],
+        column_name=column_metadata["ColumnName"],
+        data_type=column_metadata["DataType"],
+        pandas_dtype=AMO_PANDAS_TYPE_MAPPING.get(column_metadata["DataType"], "object"),
+        encoding=encoding,
+        idf=file_slice(column_metadata["IDF"]),
+        dictionary=dictionary,
+        hidx=hidx,
+        min_data_id=cs.ss.min_data_id,
+        max_data_id=cs.ss.max_data_id,
+        bit_width=idfmeta.bit_width,
+        count_bit_packed=cs.cs.count_bit_packed,
+        row_count=cs.ss.row_count,
+        base_id=column_metadata["BaseId"],
+        magnitude=column_metadata["Magnitude"],
+        is_nullable=bool(column_metadata["IsNullable"]),
+        has_nulls=bool(cs.ss.has_nulls),
+    )
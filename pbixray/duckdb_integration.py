@@ -0,0 +1,128 @@
+# ---------- IMPORTS ----------
+import json
+from .utils import import_optional
+
+# ---------- LAZY DATASET ----------
+
+def _lazy_dataset_class():
+    """Builds the dataset class on first use so that pyarrow stays an optional dependency."""
+    ds = import_optional('pyarrow.dataset', 'DuckDB integration')
+
+    class VertiPaqDataset(ds.InMemoryDataset):
+        """A pyarrow dataset whose scanner decodes the table on demand.
+
+        DuckDB scans pyarrow datasets through scanner(columns=..., filter=...), so only the
+        projected columns are decoded, batch by batch; the filter is applied to each batch.
+        """
+        def __init__(self, source, decoder=None, table_name=None, batch_rows=None, decimal_mode='fixed'):
+            super().__init__(source)
+            self._decoder = decoder
+            self._table_name = table_name
+            self._batch_rows = batch_rows
+            self._decimal_mode = decimal_mode
+
+        def scanner(self, schema=None, columns=None, filter=None, **kwargs):
+            columns = list(columns) if columns is not None else self.schema.names
+            target_schema = import_optional('pyarrow', 'DuckDB integration').schema([self.schema.field(name) for name in columns])
+            batches = (
+                batch.cast(target_schema)
+                for batch in self._decoder.iter_table(self._table_name, batch_rows=self._batch_rows, columns=columns, decimal_mode=self._decimal_mode, output='arrow')
+            )
+            return ds.Scanner.from_batches(batches, schema=target_schema, filter=filter)
+
+    return VertiPaqDataset
+
+def lazy_dataset(decoder, table_name, batch_rows=100_000, decimal_mode='fixed'):
+    """Returns a pyarrow dataset over a table that only decodes what a scan asks for."""
+    dataset_class = _lazy_dataset_class()
+    # Types come from the column plans, so every column has a concrete type and nothing is decoded
+    source = decoder.arrow_schema(table_name, decimal_mode=decimal_mode).empty_table()
+    return dataset_class(source, decoder, table_name, batch_rows, decimal_mode)
+
+def register_tables(decoder, table_names, connection=None, batch_rows=100_000, decimal_mode='fixed'):
+    """Registers tables with a DuckDB connection as lazily decoded datasets and returns the connection."""
+    duckdb = import_optional('duckdb', 'DuckDB integration')
+    connection = connection if connection is not None else duckdb.connect()
+    for table_name in table_names:
+        connection.register(table_name, lazy_dataset(decoder, table_name, batch_rows, decimal_mode))
+    return connection
+
+# ---------- QUERIES ----------
+
+def _serialize(connection, query):
+    """Parses a query into DuckDB's JSON syntax tree, or None when it is not a plain SELECT statement."""
+    serialized = json.loads(connection.execute("SELECT json_serialize_sql(?)", [query]).fetchone()[0])
+    if serialized.get('error') or len(serialized['statements']) != 1:
+        return None
+    return serialized['statements'][0]['node']
+
+def _base_tables(node):
+    """Collects the lower-cased names of all tables a syntax tree reads from."""
+    if isinstance(node, list):
+        return set().union(*(_base_tables(child) for child in node))
+    if not isinstance(node, dict):
+        return set()
+    names = {node['table_name'].lower()} if node.get('type') == 'BASE_TABLE' else set()
+    return names.union(*(_base_tables(child) for child in node.values()))
+
+def _simple_limit_scan(node, table_names):
+    """Detects 'SELECT <columns> FROM <model table> LIMIT n [OFFSET m]' queries.
+
+    Returns (table name, column names or None for all, rows needed) or None when the query does
+    more than a plain projection, in which case a LIMIT cannot be pushed into the decoder.
+    """
+    if node.get('type') != 'SELECT_NODE' or node.get('where_clause') or node.get('group_expressions') \
+            or node.get('having') or node.get('qualify') or node.get('sample') or node['cte_map']['map']:
+        return None
+    from_table = node.get('from_table') or {}
+    by_name = {name.lower(): name for name in table_names}
+    if from_table.get('type') != 'BASE_TABLE' or from_table.get('table_name', '').lower() not in by_name:
+        return None
+    table_name = by_name[from_table['table_name'].lower()]
+    modifiers = node.get('modifiers', [])
+    if len(modifiers) != 1 or modifiers[0]['type'] != 'LIMIT_MODIFIER':
+        return None
+    limit, offset = modifiers[0].get('limit'), modifiers[0].get('offset')
+    if not limit or limit.get('class') != 'CONSTANT' or (offset and offset.get('class') != 'CONSTANT'):
+        return None
+    rows = int(limit['value']['value']) + (int(offset['value']['value']) if offset else 0)
+
+    columns = []
+    for expression in node['select_list']:
+        if expression['class'] == 'STAR' and not expression.get('exclude_list') and not expression.get('replace_list') and not expression.get('columns'):
+            return table_name, None, rows
+        if expression['class'] != 'COLUMN_REF':
+            return None
+        columns.append(expression['column_names'][-1])
+    return table_name, columns, rows
+
+def query(decoder, table_names, sql, connection=None, batch_rows=100_000, decimal_mode='fixed'):
+    """Runs a DuckDB query over model tables and returns the DuckDB relation.
+
+    Referenced tables are registered as lazily decoded datasets (projection pushdown). Plain
+    'SELECT columns FROM table LIMIT n' queries on a private connection also push the row limit
+    into the decoder; on a caller's connection the view must stay complete for later queries.
+    """
+    duckdb = import_optional('duckdb', 'DuckDB integration')
+    private = connection is None
+    connection = duckdb.connect() if private else connection
+    node = _serialize(connection, sql)
+    simple = _simple_limit_scan(node, table_names) if node is not None and private else None
+    if simple is not None:
+        table_name, columns, rows = simple
+        if columns is not None:
+            # Match DuckDB's case-insensitive identifiers against the table's column names
+            by_name = {plan.column_name.lower(): plan.column_name for plan in decoder.get_column_plans(table_name)}
+            if all(name.lower() in by_name for name in columns):
+                columns = list(dict.fromkeys(by_name[name.lower()] for name in columns))
+            else:
+                # rowid, misspelled names, ...: leave them to DuckDB's binder on the full view
+                simple = None
+    if simple is not None:
+        connection.register(table_name, decoder.get_table_arrow(table_name, columns=columns, limit=rows, decimal_mode=decimal_mode))
+        return connection.sql(sql)
+
+    # Statements that do not serialize (DDL, PRAGMA, ...) may touch any table
+    referenced = _base_tables(node) if node is not None else {name.lower() for name in table_names}
+    register_tables(decoder, [name for name in table_names if name.lower() in referenced], connection, batch_rows, decimal_mode)
+    return connection.sql(sql)
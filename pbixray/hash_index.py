@@ -0,0 +1,94 @@
+# ---------- IMPORTS ----------
+from dataclasses import dataclass
+import struct
+import numpy as np
+
+# Header of a .hidx file: hash algorithm (s4), entry size, bin size, local entries per bin (u4),
+# bin count (u8), record count and bin mask (s8), then a flag for the hash statistics that follow
+HIDX_HEADER = struct.Struct('<iIIIQqqB')
+# Hash statistics: seven u8 counters and the size of the histogram elements (u4)
+HIDX_STATISTICS = struct.Struct('<7QI')
+
+# Algorithm id of the integer hash indexes of value-encoded columns, whose hash is the DataID itself
+INTEGER_HASH_ALGORITHM = -1
+# Bins are picked from the top bits of the 32-bit product of the hash and this constant
+HASH_MULTIPLIER = 314160805
+
+# ---------- HASH INDEX ----------
+
+@dataclass(frozen=True)
+class HashIndex:
+    """Hash bins and overflow entries of a .hidx file as arrays of (hash, key) pairs.
+
+    A hash of 0 marks an unused local entry. The key is the record's ordinal in the index.
+    """
+    hash_algorithm: int
+    record_count: int
+    mask: int
+    bin_hashes: np.ndarray  # (bins, local entries per bin)
+    bin_keys: np.ndarray
+    overflow_hashes: np.ndarray
+    overflow_keys: np.ndarray
+
+    @property
+    def hashes(self):
+        """Hashes of all records, bins first, then overflow entries."""
+        used = self.bin_hashes != 0
+        return np.concatenate([self.bin_hashes[used], self.overflow_hashes[self.overflow_hashes != 0]])
+
+    @property
+    def keys(self):
+        """Keys of all records, in the order of hashes."""
+        used = self.bin_hashes != 0
+        return np.concatenate([self.bin_keys[used], self.overflow_keys[self.overflow_hashes != 0]])
+
+    def bin_of(self, hash_value:int) -> int:
+        """Bin a hash falls into: the top bits of its multiplicative hash, as many as the mask has."""
+        shift = 32 - int(self.mask).bit_length()
+        return ((hash_value * HASH_MULTIPLIER) & 0xFFFFFFFF) >> shift
+
+    def find(self, hash_value:int):
+        """Returns the key stored for a hash, or None when the index does not hold it.
+
+        Only the hash's bin and the overflow entries are searched. Indexes of other hash algorithms
+        are searched in full.
+        """
+        if hash_value == 0:
+            return None
+        if self.hash_algorithm == INTEGER_HASH_ALGORITHM and len(self.bin_hashes):
+            bin_index = self.bin_of(hash_value)
+            hits = np.flatnonzero(self.bin_hashes[bin_index] == hash_value)
+            if len(hits):
+                return int(self.bin_keys[bin_index, hits[0]])
+            hits = np.flatnonzero(self.overflow_hashes == hash_value)
+            return int(self.overflow_keys[hits[0]]) if len(hits) else None
+        hits = np.flatnonzero(self.hashes == hash_value)
+        return int(self.keys[hits[0]]) if len(hits) else None
+
+# ---------- PARSING ----------
+
+def read_hash_index(buffer:bytes) -> HashIndex:
+    """Parses a .hidx file into arrays, reading all bins with a single structured view."""
+    hash_algorithm, entry_size, bin_size, local_entries, bins, record_count, mask, has_statistics = HIDX_HEADER.unpack_from(buffer, 0)
+    offset = HIDX_HEADER.size
+    if has_statistics:
+        *_, element_count, element_size = HIDX_STATISTICS.unpack_from(buffer, offset)
+        offset += HIDX_STATISTICS.size + element_count * element_size
+
+    # A bin is a chain pointer (u8) and an entry count (u4), then its local entries and padding
+    entry = np.dtype({'names': ['hash', 'key'], 'formats': ['<u4', '<u4'], 'offsets': [0, 4], 'itemsize': entry_size})
+    hash_bin = np.dtype({'names': ['entries'], 'formats': [(entry, (local_entries,))], 'offsets': [12], 'itemsize': bin_size})
+    bin_entries = np.frombuffer(buffer, dtype=hash_bin, count=bins, offset=offset)['entries']
+    offset += bins * bin_size
+
+    overflow_count, = struct.unpack_from('<Q', buffer, offset)
+    overflow = np.frombuffer(buffer, dtype=entry, count=overflow_count, offset=offset + 8)
+    return HashIndex(
+        hash_algorithm=hash_algorithm,
+        record_count=record_count,
+        mask=mask,
+        bin_hashes=bin_entries['hash'].reshape(bins, local_entries),
+        bin_keys=bin_entries['key'].reshape(bins, local_entries),
+        overflow_hashes=overflow['hash'],
+        overflow_keys=overflow['key'],
+    )
@@ -0,0 +1,96 @@
+# ---------- IMPORTS ----------
+from decimal import Decimal
+import sys
+import numpy as np
+import pandas as pd
+from .utils import smallest_int_dtype
+
+ESTIMATE_COLUMNS = ['ColumnName', 'DataType', 'Encoding', 'Rows', 'Cardinality', 'Bytes']
+
+# CPython sizes of the objects object-backed columns point to
+POINTER_SIZE = np.dtype(object).itemsize
+STR_OBJECT_SIZE = sys.getsizeof('')
+DECIMAL_OBJECT_SIZE = sys.getsizeof(Decimal(0))
+
+# Bytes per row of the fixed-width target dtypes (Int64, Float64, datetime64[ns], bool)
+FIXED_WIDTHS = {6: 8, 8: 8, 9: 8, 11: 1}
+
+# Target dtypes backed by a one byte per row mask (Int64, Float64); bool only when nullable
+MASKED_TYPES = (6, 8)
+
+# Arrow strings and binaries: int32 offsets per row
+ARROW_OFFSET_SIZE = 4
+
+# Hash table pandas builds over the categories (to check they are unique), per category
+CATEGORY_ENGINE_SIZE = 30
+
+# ---------- ESTIMATES ----------
+
+def _value_size(plan, cardinality):
+    """Average size of a distinct string (in characters) or binary value, from the dictionary file size.
+
+    String dictionaries store UTF-16 characters, so this errs on the large side for short strings
+    and on the small side for Huffman-compressed pages.
+    """
+    if plan.dictionary is None or not cardinality:
+        return 0
+    size = plan.dictionary.size_from_log / cardinality
+    return size if plan.data_type == 17 else size / 2
+
+def column_bytes(plan, cardinality, rows, decimal_mode='fixed', dtype_backend='numpy_nullable'):
+    """Estimated size in bytes of rows values of a column as get_table would return them."""
+    data_type = plan.data_type
+    nullable = plan.is_nullable or plan.has_nulls
+    # Arrow columns carry a validity bitmap, masked pandas dtypes one byte per row
+    validity = rows / 8 if dtype_backend == 'pyarrow' else rows
+    if dtype_backend == 'categorical' and plan.is_dictionary_encoded:
+        # Codes into the categories, which hold the dictionary once
+        codes = rows * smallest_int_dtype(cardinality).itemsize + cardinality * CATEGORY_ENGINE_SIZE
+        if data_type in FIXED_WIDTHS:
+            return codes + cardinality * FIXED_WIDTHS[data_type]
+        return codes + cardinality * (POINTER_SIZE + STR_OBJECT_SIZE + _value_size(plan, cardinality))
+    if data_type == 10:
+        if decimal_mode == 'arrow':
+            return rows * 16 + validity
+        if decimal_mode == 'decimal':
+            objects = min(cardinality, rows) if plan.is_dictionary_encoded else rows
+            return rows * POINTER_SIZE + objects * DECIMAL_OBJECT_SIZE
+        return rows * 8 + (0 if dtype_backend == 'numpy' and not nullable else validity)
+    if data_type not in FIXED_WIDTHS:
+        # Strings, binaries and types without a pandas mapping share one object per distinct value read
+        value_size = _value_size(plan, cardinality)
+        if dtype_backend == 'pyarrow':
+            return rows * (ARROW_OFFSET_SIZE + value_size) + validity
+        if data_type == 17:
+            # Fixed-width bytes, each row padded to the longest value
+            return rows * value_size
+        return rows * POINTER_SIZE + min(cardinality, rows) * (STR_OBJECT_SIZE + value_size)
+    width = FIXED_WIDTHS[data_type]
+    masked = data_type in MASKED_TYPES or (data_type == 11 and nullable)
+    if dtype_backend == 'pyarrow':
+        return rows * width + validity
+    if dtype_backend == 'numpy' and not nullable:
+        return rows * width
+    return rows * width + (validity if masked else 0)
+
+def estimate_memory(plans, cardinalities, rows=None, decimal_mode='fixed', dtype_backend='numpy_nullable'):
+    """Estimates the memory get_table needs for the given column plans, one row per column.
+
+    Sizes follow from the row count, the cardinality (from the schema), the target dtype and, for
+    strings and binaries, the average value size implied by the dictionary file. Nothing is decoded.
+    rows defaults to each column's row count.
+    """
+    estimates = []
+    for plan in plans:
+        column_rows = plan.row_count if rows is None else min(rows, plan.row_count)
+        cardinality = cardinalities.get(plan.column_name)
+        cardinality = int(cardinality) if pd.notna(cardinality) else 0
+        estimates.append({
+            'ColumnName': plan.column_name,
+            'DataType': plan.pandas_dtype,
+            'Encoding': plan.encoding,
+            'Rows': column_rows,
+            'Cardinality': cardinality,
+            'Bytes': int(np.ceil(column_bytes(plan, cardinality, column_rows, decimal_mode, dtype_backend))),
+        })
+    return pd.DataFrame(estimates, columns=ESTIMATE_COLUMNS)
@@ -0,0 +1,148 @@
+# ---------- IMPORTS ----------
+import re
+import pandas as pd
+from .utils import MEMORY_REPORT_LEVELS
+
+# Structure kinds, in report order
+MEMORY_STRUCTURES = ('Data', 'Dictionary', 'HashIndex', 'AttributeHierarchy', 'UserHierarchy', 'Relationship', 'Other')
+
+# Files of internal tables: <n>.H$<table>$<column>, <n>.R$<table>$<relationship>, <n>.U$<table>$<hierarchy>
+INTERNAL_FILE_PATTERN = re.compile(
+    r'^\d+\.(?P<prefix>[HRU])\$(?P<table>.+?)\$(?P<object>.+?)'
+    r'\.(?P<suffix>hidx|(?:POS_TO_ID|ID_TO_POS|INDEX|MULTI_LEVEL_ID|PARENT_POS|FIRST_CHILD_POS|CHILD_COUNT)\.0\.idf(?:meta)?)$'
+)
+# Object metadata of XLSX models: <table>.<n>.(tbl|dim|det|prt).xml, and H$/R$/U$<table>$<object>.<n>.tbl.xml
+# for internal tables
+METADATA_FILE_PATTERN = re.compile(
+    r'^(?:(?P<prefix>[HRU])\$(?P<table>.+?)\$(?P<object>.+?)|(?P<stem>.+?))\.\d+\.(?:tbl|dim|det|prt)\.xml$'
+)
+# Files of table columns: <n>.<table>.<column>.0.idf(meta) and <n>.<table>.<column>.dictionary
+COLUMN_FILE_PATTERN = re.compile(r'^\d+\.(?P<stem>.+)\.(?P<suffix>0\.idf(?:meta)?|dictionary)$')
+# Trailing object id in file names, e.g. 'Sales (12)'
+OBJECT_ID_PATTERN = re.compile(r' \(\d+\)$')
+
+INTERNAL_STRUCTURES = {'H': 'AttributeHierarchy', 'R': 'Relationship', 'U': 'UserHierarchy'}
+INTERNAL_OBJECT_TYPES = {'H': 'Column', 'R': 'Relationship', 'U': 'Hierarchy'}
+
+# ---------- NAME RESOLUTION ----------
+
+def _file_stem(file_name):
+    """<table>.<column> part of a column file name, or None."""
+    match = COLUMN_FILE_PATTERN.match(file_name) if isinstance(file_name, str) else None
+    return match.group('stem') if match else None
+
+def _normalize(name):
+    """Table name as file names spell it: ids dropped, punctuation turned into spaces."""
+    return re.sub(r'[^0-9A-Za-z]', ' ', OBJECT_ID_PATTERN.sub('', name)).strip()
+
+def _split_stem(stem, table_stems):
+    """Splits <table>.<object> at the longest known table stem, else after the table id (or first dot)."""
+    candidates = [table_stem for table_stem in table_stems if stem.startswith(table_stem + '.')]
+    if candidates:
+        table_stem = max(candidates, key=len)
+    else:
+        match = re.match(r'^(.+? \(\d+\))\.', stem)
+        table_stem = match.group(1) if match else stem.split('.', 1)[0]
+    return table_stem, stem[len(table_stem) + 1:]
+
+def _resolve_names(file_log, schema_df, table_names):
+    """Maps the (mangled) table and column names used in file names to model names.
+
+    File names replace characters of the model names and may carry object ids, so the mapping is
+    taken from the schema's own file references: the table part of internal file names delimits
+    table names, and each column's IDF name then yields its column part. Tables without columns
+    in the schema (e.g. measure tables) are matched on their normalized names.
+    """
+    table_stems = set()
+    for file_ref in file_log:
+        match = INTERNAL_FILE_PATTERN.match(file_ref['FileName'])
+        if match:
+            table_stems.add(match.group('table'))
+
+    tables, columns = {}, {}
+    for _, row in schema_df.iterrows():
+        stem = _file_stem(row['IDF'])
+        if stem is None:
+            continue
+        table_stem, column_stem = _split_stem(stem, table_stems)
+        tables[table_stem] = row['TableName']
+        columns[(table_stem, column_stem)] = row['ColumnName']
+
+    normalized = {_normalize(name): name for name in table_names}
+    for table_stem in table_stems - set(tables):
+        tables[table_stem] = normalized.get(_normalize(table_stem), OBJECT_ID_PATTERN.sub('', table_stem))
+    return tables, columns
+
+def _classify(file_name, tables, columns):
+    """Classifies a file as (table, object, object type, structure)."""
+    match = INTERNAL_FILE_PATTERN.match(file_name)
+    if match:
+        prefix, table_stem, object_stem = match.group('prefix', 'table', 'object')
+        structure = 'HashIndex' if match.group('suffix') == 'hidx' else INTERNAL_STRUCTURES[prefix]
+        name = columns.get((table_stem, object_stem), OBJECT_ID_PATTERN.sub('', object_stem))
+        return tables[table_stem], name, INTERNAL_OBJECT_TYPES[prefix], structure
+
+    match = COLUMN_FILE_PATTERN.match(file_name)
+    if match:
+        stem, suffix = match.group('stem', 'suffix')
+        structure = 'Dictionary' if suffix == 'dictionary' else 'Data'
+        table_stem, object_stem = _split_stem(stem, tables)
+        table = tables.get(table_stem, OBJECT_ID_PATTERN.sub('', table_stem))
+        if (table_stem, object_stem) in columns:
+            return table, columns[(table_stem, object_stem)], 'Column', structure
+        if object_stem.startswith('RowNumber'):
+            return table, 'RowNumber', 'RowNumber', structure
+        return table, OBJECT_ID_PATTERN.sub('', object_stem), 'Column', structure
+
+    match = METADATA_FILE_PATTERN.match(file_name)
+    if match and (match.group('table') or match.group('stem')) in tables:
+        prefix = match.group('prefix')
+        if prefix:
+            table_stem, object_stem = match.group('table', 'object')
+            name = columns.get((table_stem, object_stem), OBJECT_ID_PATTERN.sub('', object_stem))
+            return tables[table_stem], name, INTERNAL_OBJECT_TYPES[prefix], INTERNAL_STRUCTURES[prefix]
+        table = tables[match.group('stem')]
+        return table, table, 'Table', 'Other'
+
+    # Model metadata, encryption keys and other files that no table owns
+    return None, file_name, 'Model', 'Other'
+
+# ---------- REPORT ----------
+
+def memory_report(file_log, schema_df, table_names=(), level='column'):
+    """Breaks the model size down by table, object and structure kind from the file log alone.
+
+    level='file' lists every file; 'column' and 'table' pivot the sizes into one column per
+    structure kind. Percent is relative to the size of all files in the model. table_names lists
+    model tables that have no columns in schema_df.
+    """
+    if level not in MEMORY_REPORT_LEVELS:
+        raise ValueError(f"Unsupported level '{level}'. Expected one of {MEMORY_REPORT_LEVELS}.")
+    tables, columns = _resolve_names(file_log, schema_df, table_names)
+    rows = []
+    for file_ref in file_log:
+        table, name, object_type, structure = _classify(file_ref['FileName'], tables, columns)
+        rows.append({
+            'TableName': table,
+            'ObjectName': name,
+            'ObjectType': object_type,
+            'Structure': structure,
+            'FileName': file_ref['FileName'],
+            'Size': file_ref['Size'],
+        })
+    files = pd.DataFrame(rows, columns=['TableName', 'ObjectName', 'ObjectType', 'Structure', 'FileName', 'Size'])
+    total = files['Size'].sum()
+
+    def with_percent(report):
+        report['Percent'] = report['Size' if 'Size' in report else 'Total'] / total * 100 if total else 0.0
+        return report
+
+    if level == 'file':
+        return with_percent(files)
+    keys = ['TableName', 'ObjectName', 'ObjectType'] if level == 'column' else ['TableName']
+    # Files no table owns keep a null TableName and are grouped as well
+    report = files.groupby(keys + ['Structure'], dropna=False)['Size'].sum().unstack('Structure', fill_value=0)
+    report = report.reindex(columns=list(MEMORY_STRUCTURES), fill_value=0).astype('int64')
+    report['Total'] = report.sum(axis=1)
+    report = report[report['Total'] > 0].reset_index().rename_axis(columns=None)
+    return with_percent(report).sort_values('Total', ascending=False, ignore_index=True)
@@ -0,0 +1,58 @@
+# ---------- IMPORTS ----------
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from .utils import import_optional
+
+# Characters that cannot appear in file names on common file systems
+UNSAFE_FILE_NAME_CHARACTERS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+# ---------- PARQUET EXPORT ----------
+
+def parquet_file_name(table_name):
+    """Returns the file name a table is exported to."""
+    return UNSAFE_FILE_NAME_CHARACTERS.sub('_', table_name) + '.parquet'
+
+def export_table_parquet(decoder, table_name, file_path, columns=None, row_group_rows=1_000_000, decimal_mode='fixed'):
+    """Streams one table into a Parquet file, one row group per decoded batch.
+
+    Dictionary-encoded columns arrive as Arrow DictionaryArrays and are written as Parquet
+    dictionary pages; only one batch of rows is held in memory at a time. The file schema is
+    fixed up front from the column plans and every batch is cast to it, so no batch's inferred
+    types (e.g. a decimal precision) can disagree with the file.
+    """
+    pq = import_optional('pyarrow.parquet', 'Parquet export')
+    schema = decoder.arrow_schema(table_name, columns, decimal_mode=decimal_mode)
+    with pq.ParquetWriter(file_path, schema) as writer:
+        for batch in decoder.iter_table(table_name, batch_rows=row_group_rows, columns=columns, decimal_mode=decimal_mode, output='arrow'):
+            writer.write_batch(batch.cast(schema), row_group_size=row_group_rows)
+    return file_path
+
+def export_parquet(decoder, path, table_names, columns=None, row_group_rows=1_000_000, max_workers=None, decimal_mode='fixed'):
+    """Exports tables to <path>/<table>.parquet, writing several tables in parallel.
+
+    columns is either a dict of table name to column list or, for a single table, a column list.
+    Returns a dict of table name to the written file path.
+    """
+    if row_group_rows <= 0:
+        raise ValueError("row_group_rows must be positive.")
+    table_names = list(table_names)
+    if columns is not None and not isinstance(columns, dict):
+        if len(table_names) != 1:
+            raise ValueError("Pass columns as a dict of table name to column list when exporting several tables.")
+        columns = {table_names[0]: columns}
+    columns = columns or {}
+    os.makedirs(path, exist_ok=True)
+
+    file_paths = {table_name: os.path.join(path, parquet_file_name(table_name)) for table_name in table_names}
+    if len(set(file_paths.values())) != len(file_paths):
+        raise ValueError("Several tables map to the same Parquet file name.")
+
+    def export(table_name):
+        return export_table_parquet(decoder, table_name, file_paths[table_name], columns.get(table_name), row_group_rows, decimal_mode)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Iterate to surface the first error of any table
+        for _ in pool.map(export, table_names):
+            pass
+    return file_paths
@@ -0,0 +1,60 @@
+# ---------- IMPORTS ----------
+from .utils import import_optional
+
+# ---------- POLARS OUTPUT ----------
+
+def arrow_to_polars(data, use_enum=False):
+    """Converts an Arrow table or record batch to a polars DataFrame.
+
+    Dictionary-encoded string columns become Categorical columns (or Enum columns over the
+    VertiPaq dictionary with use_enum=True) without expanding the dictionary per row.
+    """
+    pl = import_optional('polars', 'Polars output')
+    pa = import_optional('pyarrow', 'Polars output')
+    frame = pl.from_arrow(data)
+    if not use_enum:
+        return frame
+    casts = []
+    for field in data.schema:
+        if pa.types.is_dictionary(field.type) and pa.types.is_string(field.type.value_type):
+            column = data.column(field.name)
+            chunk = column.chunk(0) if isinstance(column, pa.ChunkedArray) else column
+            casts.append(pl.col(field.name).cast(pl.Enum(chunk.dictionary.to_pylist())))
+    return frame.with_columns(casts) if casts else frame
+
+def scan_table(decoder, table_name, batch_rows=100_000, decimal_mode='fixed', use_enum=False):
+    """Returns a polars LazyFrame over a table backed by the VertiPaq decoder.
+
+    Projected columns and the row limit of head()/limit() are pushed into the decoder, so only
+    those columns, and only the runs covering those rows, are decoded. Predicates are applied
+    batch by batch. The schema comes from the column plans; with use_enum the string
+    dictionaries are read for the Enum categories.
+    """
+    pl = import_optional('polars', 'Polars output')
+    from polars.io.plugins import register_io_source
+
+    def schema():
+        arrow_schema = decoder.arrow_schema(table_name, decimal_mode=decimal_mode)
+        polars_schema = dict(pl.from_arrow(arrow_schema.empty_table()).schema)
+        if use_enum:
+            pa = import_optional('pyarrow', 'Polars output')
+            for field in arrow_schema:
+                if pa.types.is_dictionary(field.type) and pa.types.is_string(field.type.value_type):
+                    polars_schema[field.name] = pl.Enum(decoder.get_distinct(table_name, field.name).tolist())
+        return pl.Schema(polars_schema)
+
+    def source(with_columns, predicate, n_rows, batch_size):
+        remaining = n_rows
+        for batch in decoder.iter_table(table_name, batch_rows=batch_size or batch_rows, columns=with_columns,
+                                        limit=n_rows if predicate is None else None, decimal_mode=decimal_mode, output='arrow'):
+            frame = arrow_to_polars(batch, use_enum)
+            if predicate is not None:
+                frame = frame.filter(predicate)
+            if remaining is not None:
+                frame = frame.head(remaining)
+                remaining -= frame.height
+            yield frame
+            if remaining == 0:
+                return
+
+    return register_io_source(source, schema=schema, explain_name='pbixray', explain_detail=table_name)
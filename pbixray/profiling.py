@@ -0,0 +1,58 @@
+# ---------- IMPORTS ----------
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+PROFILE_COLUMNS = ['TableName', 'ColumnName', 'Rows', 'Nulls', 'Distinct', 'Min', 'Max', 'TopValues', 'Error']
+
+# ---------- PROFILING ----------
+
+def profile_column(decoder, table_name, column_name, top_k=5):
+    """Profiles one column from its distinct values and run lengths, without expanding rows.
+
+    Value frequencies are run lengths summed per code (bit packed rows count once each); min and
+    max come from the ranks of the distinct values that occur, nulls from the null code.
+    """
+    values, codes, run_ends = decoder.get_run_codes(table_name, column_name)
+    lengths = np.diff(run_ends, prepend=0)
+    # Slot 0 counts nulls, slot i + 1 the rows holding distinct value i
+    frequencies = np.bincount(codes + 1, weights=lengths, minlength=len(values) + 1).astype(np.int64)
+    counts = frequencies[1:]
+    present = np.flatnonzero(counts)
+    row = {
+        'TableName': table_name,
+        'ColumnName': column_name,
+        'Rows': int(run_ends[-1]) if len(run_ends) else 0,
+        'Nulls': int(frequencies[0]),
+        'Distinct': len(present),
+        'Min': None,
+        'Max': None,
+        'TopValues': [],
+        'Error': None,
+    }
+    if len(present):
+        order = np.asarray(values.iloc[present].argsort(), dtype=np.int64)
+        row['Min'] = values.iloc[present[order[0]]]
+        row['Max'] = values.iloc[present[order[-1]]]
+        # Most frequent first, ties in dictionary order
+        top = present[np.argsort(-counts[present], kind='stable')[:top_k]]
+        row['TopValues'] = [(values.iloc[position], int(counts[position])) for position in top]
+    return row
+
+def profile(decoder, columns_by_table, top_k=5, max_workers=None):
+    """Profiles columns given as {table name: [column names]} in parallel, one row per column.
+
+    Columns that cannot be decoded are reported with their error instead of failing the profile.
+    """
+    pairs = [(table_name, column_name) for table_name, column_names in columns_by_table.items() for column_name in column_names]
+
+    def profile_pair(pair):
+        try:
+            return profile_column(decoder, *pair, top_k=top_k)
+        except Exception as e:
+            # Unsupported encodings raise parser errors as well as ValueErrors; keep profiling the model
+            return {'TableName': pair[0], 'ColumnName': pair[1], 'TopValues': [], 'Error': str(e)}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        rows = list(pool.map(profile_pair, pairs))
+    return pd.DataFrame(rows, columns=PROFILE_COLUMNS)
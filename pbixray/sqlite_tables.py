@@ -0,0 +1,207 @@
+# ---------- IMPORTS ----------
+import json
+import apsw
+import numpy as np
+import pandas as pd
+from .utils import CURRENCY_SCALE
+
+# SQLite column affinity of each AMO data type; dates are ISO-8601 text, currency is REAL
+SQLITE_COLUMN_TYPES = {
+    2: 'TEXT',
+    6: 'INTEGER',
+    8: 'REAL',
+    9: 'TEXT',
+    10: 'REAL',
+    11: 'INTEGER',
+    17: 'BLOB'
+}
+
+# Python types an equality argument must have to be matched against a column of that affinity
+SQLITE_ARGUMENT_TYPES = {
+    'TEXT': (str,),
+    'INTEGER': (int, float),
+    'REAL': (int, float),
+    'BLOB': (bytes,)
+}
+
+MODULE_NAME = 'vertipaq'
+DATA_SCHEMA = 'data'
+
+# ---------- VALUE CONVERSION ----------
+
+def sqlite_values(values:pd.Series, data_type) -> list:
+    """Converts decoded values to the Python objects SQLite stores (None for nulls)."""
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        values = values.dt.strftime('%Y-%m-%d %H:%M:%S')
+    elif data_type == 10:
+        values = values / CURRENCY_SCALE
+    elif data_type == 11:
+        values = values.astype('Int64')
+    values = values.astype(object)
+    return values.where(values.notna(), None).tolist()
+
+def sqlite_value(value, data_type):
+    """Converts one decoded value to the Python object SQLite stores, like sqlite_values."""
+    if pd.isna(value):
+        return None
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).strftime('%Y-%m-%d %H:%M:%S')
+    if data_type == 10:
+        return float(value) / CURRENCY_SCALE
+    if data_type == 11:
+        return int(value)
+    return value.item() if isinstance(value, np.generic) else value
+
+def quote_identifier(name:str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+# ---------- VIRTUAL TABLE MODULE ----------
+
+class VertiPaqModule:
+    """apsw virtual table module exposing model tables; the virtual table name is the model table name."""
+    def __init__(self, decoder):
+        self._decoder = decoder
+
+    def Create(self, connection, module_name, database_name, table_name, *args):
+        plans = self._decoder.get_column_plans(table_name)
+        columns = ', '.join(f"{quote_identifier(plan.column_name)} {SQLITE_COLUMN_TYPES.get(plan.data_type, '')}".rstrip() for plan in plans)
+        return f"CREATE TABLE x({columns})", VertiPaqTable(self._decoder, table_name, plans)
+
+    Connect = Create
+
+class VertiPaqTable:
+    """A read-only virtual table over one model table."""
+    def __init__(self, decoder, table_name, plans):
+        self._decoder = decoder
+        self.table_name = table_name
+        self.plans = plans
+        self.row_count = max((plan.row_count for plan in plans), default=0)
+        # Decoded (typed) column ranges, dictionary entry positions and matched rows, kept across cursors and Filter calls
+        self._values = {}
+        self._entries = {}
+        self._matches = {}
+
+    def column_values(self, number, rows):
+        """Decoded values of a column covering the sorted rows, and the row they start at.
+
+        The first access decodes only the row range covering rows; rows outside the cached range
+        decode the whole column once.
+        """
+        start, values = self._values.get(number, (0, None))
+        if len(rows) and (values is None or rows[0] < start or rows[-1] >= start + len(values)):
+            start, stop = (int(rows[0]), int(rows[-1]) + 1) if values is None else (0, self.row_count)
+            plan = self.plans[number]
+            values = self._decoder.get_table(self.table_name, columns=[plan.column_name], offset=start, limit=stop - start)[plan.column_name].array
+            self._values[number] = (start, values)
+        return start, values
+
+    def equal_rows(self, number, value):
+        """Sorted positions of the rows whose dictionary value equals value, or None when it cannot be decided here."""
+        plan = self.plans[number]
+        if value is None:
+            # '= NULL' never matches
+            return np.arange(0)
+        accepted = SQLITE_ARGUMENT_TYPES.get(SQLITE_COLUMN_TYPES.get(plan.data_type))
+        if accepted is None or not isinstance(value, accepted):
+            # Leave type conversions (affinity) to SQLite's own re-check
+            return None
+        key = (number, value)
+        if key not in self._matches:
+            if number not in self._entries:
+                dictionary, codes = self._decoder.get_column_codes(self.table_name, plan.column_name)
+                positions = {}
+                for position, entry in enumerate(sqlite_values(dictionary, plan.data_type)):
+                    positions.setdefault(entry, []).append(position)
+                self._entries[number] = (positions, codes)
+            positions, codes = self._entries[number]
+            self._matches[key] = np.flatnonzero(np.isin(codes, positions.get(value, [])))
+        return self._matches[key]
+
+    def BestIndexObject(self, index_info:apsw.IndexInfo):
+        """Pushes equality constraints on dictionary-encoded columns and the set of used columns into the cursor.
+
+        Constraints are not omitted: SQLite re-checks them, so a pushed-down filter only has to
+        return a superset of the matching rows.
+        """
+        equalities = []
+        for n in range(index_info.nConstraint):
+            column = index_info.get_aConstraint_iColumn(n)
+            if (index_info.get_aConstraint_usable(n) and index_info.get_aConstraint_op(n) == apsw.SQLITE_INDEX_CONSTRAINT_EQ
+                    and column >= 0 and self.plans[column].is_dictionary_encoded
+                    and index_info.get_aConstraint_collation(n).upper() == 'BINARY' and column not in equalities):
+                equalities.append(column)
+                index_info.set_aConstraintUsage_argvIndex(n, len(equalities))
+
+        # colUsed has one bit per column; bit 63 stands for every column from 63 on
+        used = set(index_info.colUsed)
+        columns = [n for n in range(len(self.plans)) if n in used or (n >= 63 and 63 in used)]
+        index_info.idxStr = json.dumps({'equalities': equalities, 'columns': columns})
+
+        rows = float(self.row_count)
+        for column in equalities:
+            plan = self.plans[column]
+            rows /= max(plan.max_data_id - plan.min_data_id + 1, 1)
+        index_info.estimatedRows = max(int(rows), 1)
+        # Matching codes costs one pass over the constrained columns, then only matching rows are read
+        index_info.estimatedCost = self.row_count * len(equalities) + rows * max(len(columns), 1)
+        return True
+
+    def Open(self):
+        return VertiPaqCursor(self)
+
+    def Disconnect(self):
+        self._values, self._entries, self._matches = {}, {}, {}
+
+    Destroy = Disconnect
+
+class VertiPaqCursor:
+    """Iterates over the rows selected by Filter; column values and matches come from the table's caches."""
+    def __init__(self, table:VertiPaqTable):
+        self._table = table
+        self._rows = np.arange(0)
+        self._position = 0
+        self._columns = {}
+
+    def Filter(self, index_number, index_string, constraint_args):
+        index = json.loads(index_string) if index_string else {'equalities': [], 'columns': []}
+        self._position = 0
+        rows = None
+        for column, value in zip(index['equalities'], constraint_args):
+            matches = self._table.equal_rows(column, value)
+            if matches is not None:
+                rows = matches if rows is None else np.intersect1d(rows, matches, assume_unique=True)
+        self._rows = np.arange(self._table.row_count) if rows is None else rows
+        # The used columns' values (as decoded arrays) for the selected rows
+        self._columns = {number: self._table.column_values(number, self._rows) for number in index['columns']}
+
+    def Eof(self):
+        return self._position >= len(self._rows)
+
+    def Rowid(self):
+        return int(self._rows[self._position])
+
+    def Column(self, number):
+        if number == -1:
+            return self.Rowid()
+        if number not in self._columns:
+            self._columns[number] = self._table.column_values(number, self._rows)
+        start, values = self._columns[number]
+        return sqlite_value(values[self._rows[self._position] - start], self._table.plans[number].data_type)
+
+    def Next(self):
+        self._position += 1
+
+    def Close(self):
+        self._columns = {}
+
+# ---------- CONNECTION ----------
+
+def register_tables(connection:apsw.Connection, decoder, table_names):
+    """Creates a virtual table per model table in the attached 'data' schema of an apsw connection."""
+    connection.create_module(MODULE_NAME, VertiPaqModule(decoder), use_bestindex_object=True, read_only=True)
+    attached = {row[1] for row in connection.execute("PRAGMA database_list")}
+    if DATA_SCHEMA not in attached:
+        connection.execute(f"ATTACH DATABASE ':memory:' AS {DATA_SCHEMA}")
+    for table_name in table_names:
+        connection.execute(f"CREATE VIRTUAL TABLE {DATA_SCHEMA}.{quote_identifier(table_name)} USING {MODULE_NAME}")
+    return connection
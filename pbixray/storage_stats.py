@@ -0,0 +1,91 @@
+# ---------- IMPORTS ----------
+from concurrent.futures import ThreadPoolExecutor
+import io
+import pandas as pd
+from kaitaistruct import KaitaiStream
+from .column_data.dictionary import ColumnDataDictionary
+from .decode_plan import FileSlice
+
+STORAGE_STATS_COLUMNS = [
+    'TableName', 'ColumnName', 'Segment', 'Rows', 'Encoding', 'BitWidth', 'CountBitPacked', 'RLERuns', 'BitPackedRuns',
+    'MinDataId', 'MaxDataId', 'HasNulls', 'DictionaryType', 'DictionaryEntries', 'DictionaryPages',
+    'DataSize', 'CompressionRatio', 'Error'
+]
+
+# Type (s4), hash information (6 x s4), then the string page layout (s8, s1, s8, s8); numeric
+# dictionaries only need their element count (u8) and size (u4)
+DICTIONARY_HEADER_SIZE = 4 + 6 * 4 + 8 + 1 + 8 + 8
+
+# Bytes per row of an uncompressed DataID, the reference for the compression ratio
+DATA_ID_SIZE = 4
+
+# ---------- HEADER PARSING ----------
+
+def dictionary_header(buffer:bytes) -> dict:
+    """Parses the fixed header of a dictionary file: its type, entry count and string page count."""
+    stream = KaitaiStream(io.BytesIO(buffer))
+    dictionary_type = KaitaiStream.resolve_enum(ColumnDataDictionary.DictionaryTypes, stream.read_s4le())
+    ColumnDataDictionary.HashInfo(stream)
+    if dictionary_type == ColumnDataDictionary.DictionaryTypes.xm_type_string:
+        layout = ColumnDataDictionary.PageLayout(stream)
+        return {'DictionaryType': 'string', 'DictionaryEntries': layout.store_string_count, 'DictionaryPages': layout.store_page_count}
+    if dictionary_type in (ColumnDataDictionary.DictionaryTypes.xm_type_long, ColumnDataDictionary.DictionaryTypes.xm_type_real):
+        return {'DictionaryType': dictionary_type.name[len('xm_type_'):], 'DictionaryEntries': stream.read_u8le(), 'DictionaryPages': None}
+    # Older dictionary layouts are not decoded; report the raw type
+    return {'DictionaryType': str(getattr(dictionary_type, 'name', dictionary_type)), 'DictionaryEntries': None, 'DictionaryPages': None}
+
+# ---------- STORAGE STATISTICS ----------
+
+def column_storage_stats(decoder, column_metadata) -> list:
+    """Storage statistics of one column, one row per segment, from its .idfmeta and dictionary headers only.
+
+    The .idfmeta parser reads a single segment, so columns currently report segment 0 only.
+    """
+    file_index = decoder._get_file_index()
+    idfmeta = decoder._read_idfmeta(column_metadata)
+    cs = idfmeta.blocks.cp.cs
+    dictionary = {'DictionaryType': None, 'DictionaryEntries': None, 'DictionaryPages': None}
+    dictionary_ref = file_index.get(column_metadata['Dictionary']) if isinstance(column_metadata['Dictionary'], str) else None
+    if dictionary_ref:
+        dictionary = dictionary_header(FileSlice.from_file_ref(dictionary_ref).read_prefix(decoder._data_model, DICTIONARY_HEADER_SIZE))
+    idf_ref = file_index.get(column_metadata['IDF'])
+    data_size = idf_ref['SizeFromLog'] if idf_ref else None
+    return [{
+        'TableName': column_metadata['TableName'],
+        'ColumnName': column_metadata['ColumnName'],
+        'Segment': 0,
+        'Rows': cs.ss.row_count,
+        'Encoding': 'dictionary' if dictionary_ref else 'value',
+        'BitWidth': idfmeta.bit_width,
+        'CountBitPacked': cs.cs.count_bit_packed,
+        # Primary segment entries: plain RLE runs and runs of bit packed rows
+        'RLERuns': cs.ss.r_l_e_runs,
+        'BitPackedRuns': cs.ss.others_r_l_e_runs,
+        'MinDataId': cs.ss.min_data_id,
+        'MaxDataId': cs.ss.max_data_id,
+        'HasNulls': bool(cs.ss.has_nulls),
+        **dictionary,
+        'DataSize': data_size,
+        'CompressionRatio': cs.ss.row_count * DATA_ID_SIZE / data_size if data_size else None,
+        'Error': None,
+    }]
+
+def storage_stats(decoder, schema_df, max_workers=None):
+    """Storage statistics of the columns of a schema, parsed in parallel without decoding any column data.
+
+    Columns whose headers cannot be parsed are reported with their error.
+    """
+    rows = [row for _, row in schema_df.iterrows()]
+
+    def column_stats(column_metadata):
+        try:
+            return column_storage_stats(decoder, column_metadata)
+        except Exception as e:
+            # Older layouts raise parser errors as well as ValueErrors; keep going with the other columns
+            return [{'TableName': column_metadata['TableName'], 'ColumnName': column_metadata['ColumnName'], 'Error': str(e)}]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(column_stats, rows))
+    stats = pd.DataFrame([row for result in results for row in result], columns=STORAGE_STATS_COLUMNS)
+    counts = ['Segment', 'Rows', 'BitWidth', 'CountBitPacked', 'RLERuns', 'BitPackedRuns', 'MinDataId', 'MaxDataId', 'DictionaryEntries', 'DictionaryPages', 'DataSize']
+    return stats.astype({name: 'Int64' for name in counts})
@@ -1,5 +1,7 @@
 from .abf.data_model import DataModel
 import datetime
+import importlib
+import numpy as np
 from .xpress8 import Xpress8
 
 # ---------- CONSTANTS ----------
@@ -13,30 +15,101 @@ AMO_PANDAS_TYPE_MAPPING = {
     17: 'bytes'
 }
 
+# Fixed decimal (currency) columns are stored as integers scaled by 10^4
+CURRENCY_SCALE = 10000
+
+# Output modes for fixed decimal columns: scaled Int64, Arrow decimal128(19,4) or decimal.Decimal objects
+DECIMAL_MODES = ('fixed', 'arrow', 'decimal')
+
+# Pools get_table can decode columns on
+EXECUTORS = ('thread', 'process')
+
+# Batch types iter_table can yield
+BATCH_OUTPUTS = ('pandas', 'arrow')
+
+# Column dtypes get_table can produce: masked pandas dtypes, pd.ArrowDtype, plain numpy dtypes or
+# categoricals over the dictionary
+DTYPE_BACKENDS = ('numpy_nullable', 'pyarrow', 'numpy', 'categorical')
+
+# What get_table does when a read exceeds the memory budget: raise a MemoryError or decode categoricals
+OVER_BUDGET_ACTIONS = ('raise', 'categorical')
+
+# Comparison operators accepted in get_table filters
+FILTER_OPERATORS = ('==', '=', '!=', '<', '<=', '>', '>=', 'in', 'not in')
+
+# Aggregation functions aggregate can compute on the compressed runs
+AGGREGATIONS = ('COUNT', 'SUM', 'MIN', 'MAX', 'DISTINCTCOUNT')
+
+# Levels of detail of the memory report
+MEMORY_REPORT_LEVELS = ('file', 'column', 'table')
+
 # Windows epoch start date
 WINDOWS_EPOCH_START = datetime.datetime(1601, 1, 1)
 
 # ---------- UTILITY FUNCTIONS ----------
-def get_data_slice(data_model:DataModel, file_name:str) -> bytes:
-    """Gets a data slice based on a file name from the file log."""
-    file_ref = next((x for x in data_model.file_log if x['FileName'] == file_name), None)
-    if not file_ref:
-        raise ValueError(f"File reference not found for filename: {file_name}.")
+def import_optional(module_name:str, feature:str):
+    """Imports an optional dependency, raising a helpful ImportError when it is missing."""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(
+            f"{feature} requires the optional dependency '{module_name}'. "
+            f"Install it with `pip install {module_name}`."
+        ) from e
+
+def smallest_uint_dtype(max_value:int):
+    """Returns the narrowest unsigned dtype (uint8/16/32, else uint64) that holds max_value."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+def smallest_int_dtype(max_value:int):
+    """Returns the narrowest signed dtype (int8/16/32, else int64) that holds max_value and -1."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+def index_file_log(data_model:DataModel) -> dict:
+    """Indexes the file log by file name (the first entry wins, as in get_data_slice)."""
+    file_index = {}
+    for file_ref in data_model.file_log:
+        file_index.setdefault(file_ref['FileName'], file_ref)
+    return file_index
+
+def read_file_range(data_model:DataModel, file_name:str, offset:int, size:int, size_from_log:int) -> bytes:
+    """Reads a file stored at a known offset of the decompressed data model."""
     # if error_code trim last 4 bytes
     if data_model.error_code:
-        raw_slice =  data_model.decompressed_data[file_ref['m_cbOffsetHeader']:file_ref['m_cbOffsetHeader'] + file_ref['Size']-4]
+        raw_slice =  data_model.decompressed_data[offset:offset + size-4]
     else:
-        raw_slice =  data_model.decompressed_data[file_ref['m_cbOffsetHeader']:file_ref['m_cbOffsetHeader'] + file_ref['Size']]
+        raw_slice =  data_model.decompressed_data[offset:offset + size]
 
     if data_model.apply_compression:
         decompressed_data = Xpress8.decompress_chunked(raw_slice)
         
         # Validate the size of the decompressed data against the expected size from log
-        if len(decompressed_data) != file_ref['SizeFromLog']:
+        if len(decompressed_data) != size_from_log:
             raise ValueError(
                 f"Decompression size mismatch for file '{file_name}': "
-                f"Expected {file_ref['SizeFromLog']} bytes, got {len(decompressed_data)} bytes"
+                f"Expected {size_from_log} bytes, got {len(decompressed_data)} bytes"
             )
             
         return decompressed_data
-    return raw_slice
\ No newline at end of file
+    return raw_slice
+
+def read_file_prefix(data_model:DataModel, offset:int, size:int, length:int) -> bytes:
+    """Reads the first length bytes of a file, decompressing only the chunks that hold them."""
+    end = offset + (size - 4 if data_model.error_code else size)
+    if data_model.apply_compression:
+        raw_slice = memoryview(data_model.decompressed_data)[offset:end]
+        return bytes(Xpress8.decompress_chunked(raw_slice, max_output=length)[:length])
+    return data_model.decompressed_data[offset:min(end, offset + length)]
+
+def get_data_slice(data_model:DataModel, file_name:str) -> bytes:
+    """Gets a data slice based on a file name from the file log."""
+    file_ref = next((x for x in data_model.file_log if x['FileName'] == file_name), None)
+    if not file_ref:
+        raise ValueError(f"File reference not found for filename: {file_name}.")
+    return read_file_range(data_model, file_name, file_ref['m_cbOffsetHeader'], file_ref['Size'], file_ref['SizeFromLog'])
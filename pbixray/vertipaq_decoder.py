@@ -1,127 +1,392 @@
 # ---------- IMPORTS ----------
-from .column_data.idf import ColumnDataIdf
 from .column_data.idfmeta import IdfmetaParser
-from .column_data.hidx import ColumnDataHidx
 from .column_data.dictionary import ColumnDataDictionary
 from .abf.backup_log import BackupLog
 from .abf.virtual_directory import VirtualDirectory
-from kaitaistruct import KaitaiStream
-from .utils import AMO_PANDAS_TYPE_MAPPING, get_data_slice
+from .utils import AMO_PANDAS_TYPE_MAPPING, CURRENCY_SCALE, DECIMAL_MODES, EXECUTORS, BATCH_OUTPUTS, DTYPE_BACKENDS, FILTER_OPERATORS, OVER_BUDGET_ACTIONS, import_optional, index_file_log, smallest_int_dtype, smallest_uint_dtype
+from .arrow_output import arrow_type, dictionary_array, fixed_decimal_to_arrow, run_end_encoded_array, to_arrow, value_arrow_type
+from .decode_plan import ColumnDecodePlan, FileSlice, build_column_plan
+from .column_cache import ColumnCache
+from .memory_estimate import estimate_memory
+from .hash_index import read_hash_index
+from .storage_stats import DICTIONARY_HEADER_SIZE, dictionary_header
 import io
+import operator
+import numpy as np
 import pandas as pd
 from decimal import Decimal
 from .abf.data_model import DataModel
 
 from .huffman import decompress_encode_array,build_huffman_tree, decode_substring
 from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Target dtypes that cannot represent nulls mapped to their masked counterparts
+NULLABLE_PANDAS_TYPES = {
+    'bool': 'boolean',
+}
+
+# Masked pandas dtypes mapped to plain numpy dtypes (used by dtype_backend='numpy' for columns without nulls)
+NUMPY_PANDAS_TYPES = {
+    'string': 'object',
+    'Int64': 'int64',
+    'Float64': 'float64',
+}
+
+# Bit packed words unpacked per block (bounds the 64-bit temporary to a few MB)
+BIT_PACK_BLOCK_WORDS = 1 << 16
+
+# Date columns store days since this origin
+DATE_ORIGIN = '1899-12-30'
+
+# Value-encoded columns spanning at most this many DataIDs are filtered through a per-DataID lookup table
+FILTER_LOOKUP_MAX_SPAN = 1 << 22
+
+# Comparison functions of the filter operators other than 'in' / 'not in'
+FILTER_COMPARISONS = {
+    '==': operator.eq,
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+# Primary segment entry of an IDF file: a DataID (or bit pack marker) and its repeat count
+IDF_RUN_DTYPE = np.dtype([('data_value', '<u4'), ('repeat_value', '<u4')])
+
+# ---------- RUNS ----------
+
+@dataclass
+class ColumnRuns:
+    """Resolved runs of an IDF segment: one entry per RLE run or bit packed stretch."""
+    values: np.ndarray  # DataID of RLE runs (marker value for bit packed stretches)
+    lengths: np.ndarray
+    bit_packed: np.ndarray
+    ends: np.ndarray  # cumulative row count at the end of each run
+    packed_starts: np.ndarray  # bit packed values consumed before each run
+    sub_segment: np.ndarray
+    empty_strings: bool
+    min_data_id: int
+    bit_width: int
+    dtype: np.dtype
+
+    @property
+    def row_count(self):
+        return int(self.ends[-1]) if len(self.ends) else 0
+
+@dataclass
+class OpenColumn:
+    """A column whose runs are parsed, with its dictionary converted lazily and reused across reads."""
+    plan: ColumnDecodePlan
+    runs: ColumnRuns
+    dictionary_series: Optional[pd.Series]
+    decimal_mode: str
+    dtype_backend: str = 'numpy_nullable'
+    dictionaries: dict = field(default_factory=dict)
+
+# ---------- FIXED DECIMALS ----------
+
+def fixed_decimal_values(column_data, decimal_mode):
+    """Converts fixed decimal (currency) values, stored scaled by 10^4, according to the decimal mode."""
+    scaled = column_data.round().astype('Int64')
+    if decimal_mode == 'fixed':
+        return scaled
+    elif decimal_mode == 'arrow':
+        arrow_values = fixed_decimal_to_arrow(scaled.to_numpy(dtype=np.int64, na_value=0), scaled.isna().to_numpy())
+        return pd.Series(pd.arrays.ArrowExtensionArray(arrow_values), index=column_data.index)
+    # Opt-in legacy behaviour: one decimal.Decimal object per row
+    return scaled.astype(object).apply(lambda x: Decimal(int(x))/CURRENCY_SCALE if pd.notnull(x) else None)
 
 # ---------- VertiPaq CLASS ----------
 
 class VertiPaqDecoder:
-    def __init__(self, metadata, data_model:DataModel):
+    def __init__(self, metadata, data_model:DataModel, cache_bytes=None, memory_budget=None, over_budget='raise'):
+        if over_budget not in OVER_BUDGET_ACTIONS:
+            raise ValueError(f"Unsupported over_budget '{over_budget}'. Expected one of {OVER_BUDGET_ACTIONS}.")
+        if memory_budget is not None and memory_budget < 0:
+            raise ValueError("memory_budget must be non-negative.")
         self._meta = metadata
         self._data_model = data_model
+        self._file_index = None
+        self._table_metadata = {}
+        self._plans = {}
+        self._table_plans = {}
+        # Decoded dictionaries and columns are only kept around when a budget is given
+        self.cache = ColumnCache(cache_bytes) if cache_bytes else None
+        # Estimated bytes a single get_table call may materialize, and what to do beyond it
+        self.memory_budget = memory_budget
+        self.over_budget = over_budget
+
+    def _get_file_index(self):
+        """Indexes the file log once so plans resolve files without scanning it."""
+        if self._file_index is None:
+            self._file_index = index_file_log(self._data_model)
+        return self._file_index
+
+    def _build_column_plan(self, column_metadata):
+        """Parses the column's .idfmeta and resolves its files into a decode plan."""
+        return build_column_plan(column_metadata, self._get_file_index(), self._read_idfmeta(column_metadata))
+
+    def _read_idfmeta(self, column_metadata):
+        """Parses the .idfmeta file of a schema row's IDF."""
+        idfmeta_name = column_metadata["IDF"] + 'meta'
+        idfmeta_ref = self._get_file_index().get(idfmeta_name)
+        if not idfmeta_ref:
+            raise ValueError(f"File reference not found for filename: {idfmeta_name}.")
+        with io.BytesIO(FileSlice.from_file_ref(idfmeta_ref).read(self._data_model)) as f:
+            return IdfmetaParser.from_io(f)
 
-    def _read_bitpacked(self,sub_segment, bit_width, min_data_id):
-        """Reads bitpacked values from a sub_segment."""
-        mask = (1 << bit_width) - 1
-        res = []
-        for u8le in sub_segment:
-            for _ in range(64 // bit_width):
-                res.append((min_data_id + (u8le & mask)))
-                u8le >>= bit_width
+    def _get_table_metadata(self, table_name):
+        """Schema rows of a table's columns by column name (in schema order), split out of schema_df once per table."""
+        table_metadata = self._table_metadata.get(table_name)
+        if table_metadata is None:
+            table_metadata_df = self._meta.schema_df[self._meta.schema_df['TableName'] == table_name]
+            if table_metadata_df.empty:
+                raise ValueError(f"Table '{table_name}' not found. Available tables: {list(self._meta.schema_df['TableName'].unique())}.")
+            table_metadata = self._table_metadata[table_name] = {row['ColumnName']: row for row in table_metadata_df.to_dict('records')}
+        return table_metadata
 
-        return res
+    def _get_column_plan(self, table_name, column_name):
+        key = (table_name, column_name)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = self._build_column_plan(self._get_table_metadata(table_name)[column_name])
+        return plan
+
+    def get_column_plans(self, table_name, columns=None):
+        """Returns the decode plans of a table's columns (or of the requested columns, in that order).
+
+        Plans are built lazily once per column, so only the requested columns' .idfmeta files are parsed.
+        The plans of a whole table are kept as one tuple.
+        """
+        if columns is None:
+            plans = self._table_plans.get(table_name)
+            if plans is None:
+                plans = self._table_plans[table_name] = tuple(self._get_column_plan(table_name, name) for name in self._get_table_metadata(table_name))
+            return plans
+        return tuple(self._get_column_plan(table_name, name) for name in self._select_columns(table_name, columns))
+
+    def _select_columns(self, table_name, columns):
+        """Validates the requested column names and returns them as a list."""
+        if isinstance(columns, str):
+            columns = [columns]
+        columns = list(columns)
+        duplicated = sorted({name for name in columns if columns.count(name) > 1})
+        if duplicated:
+            raise ValueError(f"Columns requested more than once: {duplicated}.")
+        available = list(self._get_table_metadata(table_name))
+        missing = [name for name in columns if name not in available]
+        if missing:
+            raise ValueError(f"Columns {missing} not found in table '{table_name}'. Available columns: {available}.")
+        return columns
+
+    def _read_bitpacked(self,sub_segment, bit_width, min_data_id, dtype=np.int64):
+        """Reads bitpacked values from a sub_segment as DataIDs of the given dtype."""
+        words = np.asarray(sub_segment, dtype=np.uint64)
+        per_word = 64 // bit_width
+        shifts = np.arange(per_word, dtype=np.uint64) * np.uint64(bit_width)
+        mask = np.uint64((1 << bit_width) - 1)
+        values = np.empty(len(words) * per_word, dtype=dtype)
+        # Unpack in blocks so the 64-bit intermediate stays small for long columns
+        step = BIT_PACK_BLOCK_WORDS
+        for start in range(0, len(words), step):
+            codes = (words[start:start + step, None] >> shifts) & mask
+            values[start * per_word:(start + len(codes)) * per_word] = codes.ravel()
+        values += min_data_id
+        return values
 
     def _extract_strings(self,buffer):
         """Extract zero-terminated strings from buffer."""
         strings = buffer.split('\0')
         return strings[:-1]  # remove the last empty string
 
-    def _read_rle_bit_packed_hybrid(self,buffer, entries, min_data_id, bit_width ):
-        """Reads RLE bit packed hybrid values from a buffer."""
-        with io.BytesIO(buffer) as f:
-            # Parse the binary data
-            column_data = ColumnDataIdf(KaitaiStream(f))
-            
-            bitpacked_values = []
-            vector = []
-            bit_packed_entries = None
-            bit_packed_offset = 0
-            
-            if entries > 0:
-                # Get bit width
-                size = column_data.segments[0].sub_segment_size
-                # case if it's a column with empty strings
-                if column_data.segments[0].sub_segment[-1].bit_length() == 0 and size == 1:
-                    bitpacked_values = [min_data_id] * entries
-                else:
-                    # read the bitpacked values from the sub_segment
-                    bitpacked_values = self._read_bitpacked(column_data.segments[0].sub_segment,bit_width, min_data_id)
-
-            # consider only the first primary segment + sub segment combination
-            # for segment in column_data.segments: 
-            for entry in column_data.segments[0].primary_segment:
-                if entry.data_value+bit_packed_offset== 0xFFFFFFFF: # bit pack marker
-                    bit_packed_entries = entry.repeat_value
-                    bitpacked_values_slice = bitpacked_values[bit_packed_offset:bit_packed_offset+bit_packed_entries]
-                    bit_packed_offset += bit_packed_entries
-                    vector+=bitpacked_values_slice
-                else:
-                    rle = [entry.data_value] * entry.repeat_value
-                    vector+=rle
+    def _read_idf_segment(self, buffer):
+        """Reads the first primary segment (RLE runs) and sub segment (bit packed words) of an IDF buffer."""
+        primary_entries = int.from_bytes(buffer[0:8], 'little')
+        sub_segment_offset = 8 + IDF_RUN_DTYPE.itemsize * primary_entries
+        if sub_segment_offset + 8 > len(buffer):
+            raise ValueError(f"IDF buffer of {len(buffer)} bytes is too short for {primary_entries} primary segment entries.")
+        sub_segment_words = int.from_bytes(buffer[sub_segment_offset:sub_segment_offset + 8], 'little')
+        if sub_segment_offset + 8 + 8 * sub_segment_words > len(buffer):
+            raise ValueError(f"IDF buffer of {len(buffer)} bytes is too short for {sub_segment_words} sub segment words.")
+        primary_segment = np.frombuffer(buffer, dtype=IDF_RUN_DTYPE, count=primary_entries, offset=8)
+        sub_segment = np.frombuffer(buffer, dtype='<u8', count=sub_segment_words, offset=sub_segment_offset + 8)
+        return primary_segment, sub_segment
 
-            return vector
+    def _read_runs(self, primary_segment, bit_packed_available, row_count=None):
+        """Resolves primary segment entries into runs of (DataID, length, is bit packed).
 
-    def _read_idfmeta(self,buffer):
-        """Reads idfmeta from a buffer."""
-        # Use io.BytesIO to wrap the bytearray
-        with io.BytesIO(buffer) as f:
-            metadata = IdfmetaParser.from_io(f)
-            
-            # Extract the necessary data from the Kaitai Struct
-            row_data = {
-                'min_data_id': metadata.blocks.cp.cs.ss.min_data_id,
-                'count_bit_packed': metadata.blocks.cp.cs.cs.count_bit_packed,
-                'bit_width': metadata.bit_width,
-            }
-            
-            return row_data
+        Bit packed runs consume the bit packed values in order and never past the available values;
+        entries beyond row_count (unused primary segment slots) are dropped.
+        """
+        run_values = primary_segment['data_value'].astype(np.int64)
+        run_lengths = primary_segment['repeat_value'].astype(np.int64)
+        run_bit_packed = np.zeros(len(primary_segment), dtype=bool)
+        bit_packed_offset = 0
+        rows = 0
+        for i, (data_value, repeat_value) in enumerate(primary_segment.tolist()):
+            if row_count is not None and rows >= row_count:
+                return run_values[:i], run_lengths[:i], run_bit_packed[:i]
+            if data_value+bit_packed_offset== 0xFFFFFFFF: # bit pack marker
+                run_lengths[i] = max(0, min(repeat_value, bit_packed_available - bit_packed_offset))
+                run_bit_packed[i] = True
+                bit_packed_offset += repeat_value
+            if row_count is not None and rows + run_lengths[i] > row_count:
+                run_lengths[i] = row_count - rows
+            rows += run_lengths[i]
+        return run_values, run_lengths, run_bit_packed
 
-    def _read_hash_table(self,buffer):
-        """Reads a hash table from a buffer."""
-        with io.BytesIO(buffer) as f:
-            # Parse the .hidx file using the Kaitai Struct
-            parsed_hidx = ColumnDataHidx.from_io(f)
-
-            # Create a hash table to store the results
-            result_hash_table = {}
-
-            # Iterate over each hash_bin entry
-            for hash_bin in parsed_hidx.hash_bin_entries:
-                # Iterate over each m_rg_local_entry inside hash_bin
-                for local_entry in hash_bin.m_rg_local_entries:
-                    # If the m_hash is non-zero, add it to the result hash table
-                    if local_entry.m_hash != 0:
-                        result_hash_table[local_entry.m_hash] =  local_entry.m_key
-            
-            # Iterate over the overflow_hash_entries
-            for overflow_entry in parsed_hidx.overflow_hash_entries:
-                # If the m_hash is non-zero, add it to the result hash table
-                if overflow_entry.m_hash != 0:
-                    result_hash_table[overflow_entry.m_hash] = overflow_entry.m_key 
-
-            return result_hash_table
-
- 
-    def _read_dictionary(self, buffer, min_data_id):
-        """Reads a dictionary from a buffer."""
+    def _prepare_runs(self, buffer, entries, min_data_id, bit_width, row_count=None):
+        """Parses an IDF buffer into its runs once, so row ranges can be expanded from them repeatedly."""
+        # consider only the first primary segment + sub segment combination
+        primary_segment, sub_segment = self._read_idf_segment(buffer)
+
+        empty_strings = entries > 0 and len(sub_segment) == 1 and sub_segment[-1] == 0
+        per_word = 64 // bit_width if bit_width else 0
+        if entries <= 0:
+            bit_packed_available = 0
+        elif empty_strings:
+            bit_packed_available = entries
+        else:
+            bit_packed_available = len(sub_segment) * per_word
+        run_values, run_lengths, run_bit_packed = self._read_runs(primary_segment, bit_packed_available, row_count)
+
+        # DataIDs are emitted in the narrowest unsigned dtype that fits the RLE values and the bit width
+        max_data_id = min_data_id + (1 << bit_width) - 1 if bit_packed_available else 0
+        rle_values = run_values[~run_bit_packed]
+        if len(rle_values):
+            max_data_id = max(max_data_id, int(rle_values.max()))
+        dtype = smallest_uint_dtype(max_data_id) if min_data_id >= 0 else np.dtype(np.int64)
+
+        run_ends = np.cumsum(run_lengths)
+        packed_ends = np.cumsum(np.where(run_bit_packed, run_lengths, 0))
+        return ColumnRuns(run_values, run_lengths, run_bit_packed, run_ends, packed_ends - np.where(run_bit_packed, run_lengths, 0),
+                          sub_segment, empty_strings, min_data_id, bit_width, dtype)
+
+    def _runs_in_range(self, runs, start=0, stop=None):
+        """Returns the runs covering rows [start, stop) trimmed to the range, and the bit packed values before them."""
+        stop = runs.row_count if stop is None else min(stop, runs.row_count)
+        if start >= stop:
+            return runs.values[:0], runs.lengths[:0], runs.bit_packed[:0], 0
+        first = int(np.searchsorted(runs.ends, start, side='right'))
+        last = int(np.searchsorted(runs.ends, stop, side='left'))
+        run_values, run_bit_packed = runs.values[first:last + 1], runs.bit_packed[first:last + 1]
+        run_lengths = runs.lengths[first:last + 1].copy()
+        # Trim the partial first and last runs
+        partial = start - (int(runs.ends[first]) - int(runs.lengths[first]))
+        run_lengths[0] -= partial
+        run_lengths[-1] -= int(runs.ends[last]) - stop
+        packed_skipped = int(runs.packed_starts[first]) + (partial if run_bit_packed[0] else 0)
+        return run_values, run_lengths, run_bit_packed, packed_skipped
+
+    def _read_packed(self, runs, packed_skipped, packed_needed):
+        """Unpacks packed_needed bit packed values after the first packed_skipped, touching only the covering words."""
+        if runs.empty_strings:
+            # case if it's a column with empty strings
+            return np.full(packed_needed, runs.min_data_id, dtype=runs.dtype)
+        if not packed_needed:
+            return np.empty(0, dtype=runs.dtype)
+        per_word = 64 // runs.bit_width
+        first_word = packed_skipped // per_word
+        stop_word = -(-(packed_skipped + packed_needed) // per_word)
+        words = self._read_bitpacked(runs.sub_segment[first_word:stop_word], runs.bit_width, runs.min_data_id, runs.dtype)
+        skip = packed_skipped - first_word * per_word
+        return words[skip:skip + packed_needed]
+
+    def _expand_runs(self, runs, start=0, stop=None, valid_data_ids=None, selection=None):
+        """Expands rows [start, stop) of parsed runs into DataIDs.
+
+        Runs outside the range are skipped and only the bit packed words covering it are unpacked.
+        Returns the DataIDs and, when valid_data_ids=(first, stop) is given, a validity mask built
+        while expanding (None when every row is valid). selection (row positions relative to start)
+        keeps only those rows.
+        """
+        run_values, run_lengths, run_bit_packed, packed_skipped = self._runs_in_range(runs, start, stop)
+        packed = self._read_packed(runs, packed_skipped, int(run_lengths[run_bit_packed].sum()))
+
+        vector = np.repeat(run_values.astype(runs.dtype), run_lengths)
+        bit_packed_rows = np.repeat(run_bit_packed, run_lengths)
+        vector[bit_packed_rows] = packed
+        if selection is not None:
+            vector = vector[selection]
+
+        if valid_data_ids is None:
+            return vector, None
+
+        # Validity is decided once per RLE run and once per bit packed value
+        first, stop = valid_data_ids
+        run_valid = (run_values >= first) & (run_values < stop)
+        if run_valid[~run_bit_packed & (run_lengths > 0)].all() and ((packed >= first) & (packed < stop)).all():
+            return vector, None
+        validity = np.repeat(run_valid, run_lengths)
+        validity[bit_packed_rows] = (packed >= first) & (packed < stop)
+        return vector, validity if selection is None else validity[selection]
+
+    def _filter_rows(self, runs, match):
+        """Evaluates a DataID predicate on parsed runs: once per RLE run and once per bit packed value.
+
+        Returns a boolean row mask; DataIDs are never expanded per row.
+        """
+        run_values, run_lengths, run_bit_packed, packed_skipped = self._runs_in_range(runs)
+        packed = self._read_packed(runs, packed_skipped, int(run_lengths[run_bit_packed].sum()))
+        run_matches = np.zeros(len(run_values), dtype=bool)
+        # Bit packed stretches carry a marker, not a DataID
+        run_matches[~run_bit_packed] = match(run_values[~run_bit_packed])
+        mask = np.repeat(run_matches, run_lengths)
+        mask[np.repeat(run_bit_packed, run_lengths)] = match(packed)
+        return mask
+
+    def _run_end_data_ids(self, runs, start=0, stop=None):
+        """Returns the DataID and run end (relative to start) of each run in rows [start, stop), without expanding RLE runs.
+
+        Only bit packed stretches are materialized, one value per row; adjacent runs with the same DataID are merged.
+        """
+        run_values, run_lengths, run_bit_packed, packed_skipped = self._runs_in_range(runs, start, stop)
+        packed = self._read_packed(runs, packed_skipped, int(run_lengths[run_bit_packed].sum()))
+        counts = np.where(run_bit_packed, run_lengths, 1)
+        from_packed = np.repeat(run_bit_packed, counts)
+        data_ids = np.repeat(run_values.astype(runs.dtype), counts)
+        data_ids[from_packed] = packed
+        lengths = np.ones(len(data_ids), dtype=np.int64)
+        lengths[~from_packed] = run_lengths[~run_bit_packed]
+        # Arrow run ends must be strictly increasing: drop empty runs and merge repeated DataIDs
+        keep = lengths > 0
+        data_ids, lengths = data_ids[keep], lengths[keep]
+        if len(data_ids) == 0:
+            return data_ids, lengths
+        run_ends = np.cumsum(lengths)
+        last_of_run = np.append(data_ids[1:] != data_ids[:-1], True)
+        return data_ids[last_of_run], run_ends[last_of_run]
+
+    def _read_rle_bit_packed_hybrid(self,buffer, entries, min_data_id, bit_width, valid_data_ids=None, row_count=None, start=0, stop=None):
+        """Reads RLE bit packed hybrid values from a buffer.
+
+        Returns the expanded DataIDs and, when valid_data_ids=(first, stop) is given, a validity
+        mask built while expanding (None when every row is valid). DataIDs outside the range are
+        treated as the null DataID. Expansion stops after row_count rows when it is given.
+        With start/stop only rows [start, stop) are expanded.
+        """
+        if stop is not None:
+            # No need to resolve runs past the range
+            row_count = stop if row_count is None else min(stop, row_count)
+        runs = self._prepare_runs(buffer, entries, min_data_id, bit_width, row_count)
+        return self._expand_runs(runs, start, stop, valid_data_ids)
+
+    def _read_hash_index(self, plan):
+        """Reads a column's .hidx file into arrays of hashes and keys."""
+        return read_hash_index(plan.hidx.read(self._data_model))
+
+    def _read_dictionary(self, buffer):
+        """Reads a dictionary from a buffer, returning its values in DataID order."""
         with io.BytesIO(buffer) as f:
             dictionary = ColumnDataDictionary.from_io(f)
 
         if dictionary.dictionary_type == ColumnDataDictionary.DictionaryTypes.xm_type_string:
-            hashtable = {}
-            index = min_data_id
+            values = []
 
             pages = dictionary.data.dictionary_pages
             record_handles = dictionary.data.dictionary_record_handles_vector_info.vector_of_record_handle_structures
@@ -146,68 +411,611 @@ class VertiPaqDecoder:
                         for i in range(len(offsets)):
                             start_bit = offsets[i]
                             end_bit = offsets[i + 1] if i + 1 < len(offsets) else store_total_bits
-                            decompressed = decode_substring(compressed_string_buffer, huffman_tree, start_bit, end_bit)
-                            hashtable[index] = decompressed
-                            index += 1
+                            values.append(decode_substring(compressed_string_buffer, huffman_tree, start_bit, end_bit))
                     del huffman_tree
                 else:
                     uncompressed_store = page.string_store
                     uncompressed = uncompressed_store.uncompressed_character_buffer
-                    strings = self._extract_strings(uncompressed)
-                    for i, token in enumerate(strings):
-                        hashtable[index] = token
-                        index += 1
+                    values.extend(self._extract_strings(uncompressed))
 
-            return hashtable
+            return values
         elif dictionary.dictionary_type in [ColumnDataDictionary.DictionaryTypes.xm_type_long, ColumnDataDictionary.DictionaryTypes.xm_type_real]:
-            vector_values = dictionary.data.vector_of_vectors_info.values
-            return {i: val for i, val in enumerate(vector_values, start=min_data_id)}
+            return list(dictionary.data.vector_of_vectors_info.values)
 
-        return None    
-        
-    def _get_column_data(self, column_metadata, meta):
-        """Extracts column data based on the given column metadata and meta information."""
-        if pd.notnull(column_metadata["Dictionary"]):
-            dictionary_buffer = get_data_slice(self._data_model,column_metadata["Dictionary"])
-            null_adjustment = 1 if column_metadata["IsNullable"] else 0
-            # Read and construct the dictionary with appropriate minimum data ID
-            min_data_id_adj = meta['min_data_id'] - null_adjustment
-            dictionary = self._read_dictionary(dictionary_buffer, min_data_id=meta['min_data_id'])
-            data_slice = get_data_slice(self._data_model,column_metadata["IDF"])
-            return pd.Series(self._read_rle_bit_packed_hybrid(data_slice, meta['count_bit_packed'], min_data_id_adj , meta['bit_width'])).map(dictionary)
-        elif pd.notnull(column_metadata["HIDX"]):
-            data_slice = get_data_slice(self._data_model,column_metadata["IDF"])
-            return pd.Series(self._read_rle_bit_packed_hybrid(data_slice, meta['count_bit_packed'], meta['min_data_id'], meta['bit_width'])).add(column_metadata["BaseId"]) / column_metadata["Magnitude"]
+        return None
+
+    def _convert_values(self, values, data_type, decimal_mode, nullable=False, dtype_backend='numpy_nullable'):
+        """Converts raw stored values to the target pandas type of the column.
+
+        With nullable=True a masked dtype is used where the target dtype cannot hold nulls. With
+        dtype_backend='numpy' plain numpy dtypes are used instead of masked ones unless nullable.
+        """
+        values = self._handle_special_cases(values, data_type, decimal_mode)
+        numpy_backend = dtype_backend == 'numpy' and not nullable
+        # Fixed decimals are already typed according to decimal_mode
+        if data_type == 10:
+            return values.astype(np.int64) if numpy_backend and decimal_mode == 'fixed' else values
+        pandas_dtype = AMO_PANDAS_TYPE_MAPPING.get(data_type, "object")  # default to object if no mapping is found
+        if nullable:
+            pandas_dtype = NULLABLE_PANDAS_TYPES.get(pandas_dtype, pandas_dtype)
+        elif numpy_backend:
+            pandas_dtype = NUMPY_PANDAS_TYPES.get(pandas_dtype, pandas_dtype)
+        return values.astype(pandas_dtype)
+
+    def _parse_dictionary(self, plan, buffer):
+        """Parses a column's dictionary buffer into a Series of raw values in DataID order."""
+        dictionary_values = self._read_dictionary(buffer)
+        if dictionary_values is None:
+            raise ValueError(f"Unsupported dictionary type for column {plan.column_name} in table.")
+        return pd.Series(dictionary_values)
+
+    def _get_dictionary(self, plan):
+        """Returns the raw dictionary values of a column as a Series in DataID order."""
+        key = ('dictionary', plan.table_name, plan.column_name)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        dictionary = self._parse_dictionary(plan, plan.dictionary.read(self._data_model))
+        if self.cache is not None:
+            # Strings are counted in full here since the dictionary owns the distinct values
+            return self.cache.put(key, dictionary, int(dictionary.memory_usage(index=False, deep=True)))
+        return dictionary
+
+    def _get_cached_column(self, plan, decimal_mode, rows=None, dtype_backend='numpy_nullable'):
+        """Returns the cached column (or its rows [start, stop)), or None when it is not cached."""
+        cached = self.cache.get(('column', plan.table_name, plan.column_name, decimal_mode, dtype_backend))
+        if cached is None or rows is None:
+            return cached
+        return cached.iloc[rows[0]:rows[1]].reset_index(drop=True)
+
+    def _decode_column(self, plan, decimal_mode='fixed', rows=None, dtype_backend='numpy_nullable'):
+        """Decodes a column (or its rows [start, stop)) into typed values, going through the cache when one is configured."""
+        if self.cache is None:
+            return self._decode_column_data(plan, decimal_mode, rows, dtype_backend)
+        cached = self._get_cached_column(plan, decimal_mode, rows, dtype_backend)
+        if cached is not None:
+            return cached
+        column = self._decode_column_data(plan, decimal_mode, rows, dtype_backend)
+        if rows is not None:
+            # Partial reads are not cached, only complete columns are
+            return column
+        key = ('column', plan.table_name, plan.column_name, decimal_mode, dtype_backend)
+        # Rows of object columns reference the dictionary's values, so only the row buffer is counted
+        return self.cache.put(key, column, int(column.memory_usage(index=False, deep=False)))
+
+    def _decode_column_data(self, plan, decimal_mode='fixed', rows=None, dtype_backend='numpy_nullable'):
+        """Reads a column's files and decodes them into typed values."""
+        dictionary_series = self._get_dictionary(plan) if plan.is_dictionary_encoded else None
+        return self._decode_buffers(plan, plan.idf.read(self._data_model), dictionary_series, decimal_mode, rows, dtype_backend)
+
+    def _decode_buffers(self, plan, data_slice, dictionary_series, decimal_mode='fixed', rows=None, dtype_backend='numpy_nullable'):
+        """Decodes a column from its IDF buffer (and raw dictionary values) following its decode plan.
+
+        rows=(start, stop) restricts decoding to that row range.
+        """
+        start, stop = rows if rows is not None else (0, None)
+        column = self._open_column(plan, data_slice, dictionary_series, decimal_mode, stop, dtype_backend)
+        return self._read_column_rows(column, start, stop)
+
+    def _open_column(self, plan, data_slice, dictionary_series, decimal_mode='fixed', stop=None, dtype_backend='numpy_nullable'):
+        """Parses a column's runs once so that row ranges can be read from it repeatedly."""
+        row_count = plan.row_count if stop is None else min(stop, plan.row_count)
+        runs = self._prepare_runs(data_slice, plan.count_bit_packed, plan.bit_packed_min_data_id, plan.bit_width, row_count)
+        return OpenColumn(plan, runs, dictionary_series, decimal_mode, dtype_backend)
+
+    def _converted_dictionary(self, column, nullable):
+        """Converts an open column's dictionary to the target type once, as a (masked if nullable) array."""
+        if nullable not in column.dictionaries:
+            converted = self._convert_values(column.dictionary_series, column.plan.data_type, column.decimal_mode, nullable=nullable, dtype_backend=column.dtype_backend)
+            column.dictionaries[nullable] = converted.array
+        return column.dictionaries[nullable]
+
+    def _dictionary_positions(self, column, start=0, stop=None, selection=None):
+        """Expands rows [start, stop) of a dictionary-encoded column into dictionary positions and validity.
+
+        Positions stay as narrow as the DataIDs; null rows (any DataID outside the dictionary) wrap around
+        and are flagged in the validity mask.
+        """
+        plan = column.plan
+        # Dictionary values start at min_data_id; any other DataID (e.g. the null DataID) is a null row
+        valid_data_ids = (plan.min_data_id, plan.min_data_id + len(column.dictionary_series))
+        data_ids, validity = self._expand_runs(column.runs, start, stop, valid_data_ids, selection)
+        if plan.min_data_id > np.iinfo(data_ids.dtype).max:
+            data_ids = data_ids.astype(np.int64)
+        return data_ids - data_ids.dtype.type(plan.min_data_id), validity
+
+    def _read_column_rows(self, column, start=0, stop=None, selection=None):
+        """Reads rows [start, stop) of an open column (only the selection within them, if given) as typed values.
+
+        Dictionary-encoded columns convert the distinct dictionary values once and then
+        materialize rows by indexing into the converted dictionary; null rows come from the
+        validity mask produced during expansion and are stored directly as masked values.
+        With the 'pyarrow' dtype backend the column is built as an Arrow array instead.
+        """
+        if column.dtype_backend == 'pyarrow':
+            array = self._read_column_arrow(column, start, stop, selection)
+            if column.plan.is_dictionary_encoded:
+                array = array.dictionary_decode()
+            return pd.Series(pd.arrays.ArrowExtensionArray(array))
+        if column.plan.is_dictionary_encoded:
+            positions, validity = self._dictionary_positions(column, start, stop, selection)
+            categorical_dtype = self._categorical_dtype(column) if column.dtype_backend == 'categorical' else None
+            if categorical_dtype is not None:
+                codes = positions.astype(smallest_int_dtype(len(categorical_dtype.categories)), copy=False)
+                if validity is not None:
+                    codes[~validity] = -1
+                return pd.Series(pd.Categorical.from_codes(codes, dtype=categorical_dtype))
+            if validity is None:
+                return pd.Series(self._converted_dictionary(column, False).take(positions))
+            # Nullable target so that nulls become a mask rather than NaN/object values
+            dictionary = self._converted_dictionary(column, True)
+            positions = positions.astype(smallest_int_dtype(len(dictionary)), copy=False)
+            positions[~validity] = -1
+            return pd.Series(dictionary.take(positions, allow_fill=True))
+        return self._read_value_rows(column, start, stop, selection)
+
+    def _read_value_rows(self, column, start=0, stop=None, selection=None):
+        """Reads rows [start, stop) of an open value-encoded column: (DataID + BaseId) / Magnitude."""
+        data_ids, _ = self._expand_runs(column.runs, start, stop, selection=selection)
+        # Arrow arrays are built from the masked types, so only the numpy backend changes the dtype here
+        dtype_backend = 'numpy' if column.dtype_backend == 'numpy' else 'numpy_nullable'
+        return self._data_id_values(column.plan, data_ids, column.decimal_mode, dtype_backend)
+
+    def _data_id_values(self, plan, data_ids, decimal_mode, dtype_backend='numpy_nullable'):
+        """Converts DataIDs of a value-encoded column to values: (DataID + BaseId) / Magnitude.
+
+        In columns with nulls the DataIDs below min_data_id (the null DataID) become nulls, under a
+        masked dtype even with the numpy backend.
+        """
+        data_ids = data_ids.astype(np.int64)
+        values = (data_ids + plan.base_id) / plan.magnitude
+        nulls = data_ids < plan.min_data_id if plan.has_nulls else None
+        if nulls is not None and nulls.any():
+            values[nulls] = np.nan
+            return self._convert_values(pd.Series(values), plan.data_type, decimal_mode, nullable=True)
+        return self._convert_values(pd.Series(values), plan.data_type, decimal_mode, dtype_backend=dtype_backend)
+
+    def _categorical_dtype(self, column):
+        """CategoricalDtype over an open column's converted dictionary, or None when the values cannot be categories.
+
+        The codes of a categorical are the dictionary positions themselves, so each row costs one
+        narrow integer. Dictionaries with nulls or repeated converted values are decoded normally.
+        """
+        if 'categorical' not in column.dictionaries:
+            values = self._converted_dictionary(column, False)
+            # Fixed-width bytes (binary columns) cannot back an Index
+            categories = pd.Index(values.astype(object) if values.dtype.kind == 'S' else values)
+            usable = categories.is_unique and not categories.hasnans
+            column.dictionaries['categorical'] = pd.CategoricalDtype(categories) if usable else None
+        return column.dictionaries['categorical']
+
+    def _to_arrow(self, plan, values, decimal_mode):
+        """Converts typed values of a column to Arrow.
+
+        decimal.Decimal values get the fixed currency type rather than a precision inferred from
+        each batch, so every batch of a column has the same type.
+        """
+        if plan.data_type == 10 and decimal_mode == 'decimal':
+            return to_arrow(values, value_arrow_type(plan, decimal_mode))
+        return to_arrow(values)
+
+    def _arrow_dictionary(self, column):
+        """Converts an open column's dictionary to an Arrow array once."""
+        if 'arrow' not in column.dictionaries:
+            column.dictionaries['arrow'] = self._to_arrow(column.plan, self._converted_dictionary(column, False), column.decimal_mode)
+        return column.dictionaries['arrow']
+
+    def _read_column_arrow(self, column, start=0, stop=None, selection=None):
+        """Reads rows [start, stop) of an open column (only the selection within them, if given) as an Arrow array.
+
+        Dictionary-encoded columns become DictionaryArrays of the DataID-derived codes over the
+        dictionary converted once; value-encoded columns become primitive arrays.
+        """
+        if column.plan.is_dictionary_encoded:
+            positions, validity = self._dictionary_positions(column, start, stop, selection)
+            return dictionary_array(positions, validity, self._arrow_dictionary(column))
+        return self._to_arrow(column.plan, self._read_value_rows(column, start, stop, selection).array, column.decimal_mode)
+
+    def _read_column_run_end(self, column, start=0, stop=None):
+        """Reads rows [start, stop) of an open column as an Arrow RunEndEncodedArray.
+
+        Values are materialized once per run (dictionary values taken by run), never once per row
+        of an RLE run.
+        """
+        plan = column.plan
+        data_ids, run_ends = self._run_end_data_ids(column.runs, start, stop)
+        if plan.is_dictionary_encoded:
+            dictionary = self._arrow_dictionary(column)
+            positions = data_ids.astype(np.int64) - plan.min_data_id
+            validity = (positions >= 0) & (positions < len(dictionary))
+            values = dictionary_array(positions, None if validity.all() else validity, dictionary).dictionary_decode()
         else:
-            raise ValueError(f"Neither dictionary nor hidx found for column {column_metadata['ColumnName']} in table.")
-        
-    def _handle_special_cases(self, column_data, data_type):
+            values = self._to_arrow(plan, self._data_id_values(plan, data_ids, column.decimal_mode).array, column.decimal_mode)
+        return run_end_encoded_array(run_ends, values)
+
+    def _open_columns(self, plans, decimal_mode, stop=None, dtype_backend='numpy_nullable'):
+        """Opens the columns of the given plans, reading each dictionary once (through the cache when enabled)."""
+        return [
+            self._open_column(plan, plan.idf.read(self._data_model), self._get_dictionary(plan) if plan.is_dictionary_encoded else None, decimal_mode, stop, dtype_backend)
+            for plan in plans
+        ]
+
+    def _check_decimal_mode(self, decimal_mode):
+        if decimal_mode not in DECIMAL_MODES:
+            raise ValueError(f"Unsupported decimal_mode '{decimal_mode}'. Expected one of {DECIMAL_MODES}.")
+
+    def _check_dtype_backend(self, dtype_backend, require_pyarrow=True):
+        if dtype_backend not in DTYPE_BACKENDS:
+            raise ValueError(f"Unsupported dtype_backend '{dtype_backend}'. Expected one of {DTYPE_BACKENDS}.")
+        if dtype_backend == 'pyarrow' and require_pyarrow:
+            import_optional('pyarrow', "dtype_backend='pyarrow'")
+
+    def _handle_special_cases(self, column_data, data_type, decimal_mode='fixed'):
         if data_type == 9:
             # Convert to datetime
-            return pd.to_datetime(column_data, unit='d', origin='1899-12-30')
+            return pd.to_datetime(column_data, unit='d', origin=DATE_ORIGIN)
         elif data_type == 10:
-            # Handle decimal.Decimal type
-            return column_data.apply(lambda x: Decimal(x)/10000 if pd.notnull(x) else None)
+            return fixed_decimal_values(column_data, decimal_mode)
         return column_data
         
-    def get_table(self, table_name):
-        """Generates a DataFrame representation of the specified table."""
-        table_metadata_df = self._meta.schema_df[self._meta.schema_df['TableName'] == table_name]
-        dataframe_data = {}
-
-        for _, column_metadata in table_metadata_df.iterrows():
-            idfmeta_buffer = get_data_slice(self._data_model,column_metadata["IDF"] + 'meta')
-            meta = self._read_idfmeta(idfmeta_buffer)
-            
-            column_data = self._get_column_data(column_metadata, meta)
-            # Handle special cases for certain data types
-            column_data = self._handle_special_cases(column_data, column_metadata["DataType"])
-            
-            pandas_dtype = AMO_PANDAS_TYPE_MAPPING.get(column_metadata["DataType"], "object")  # default to object if no mapping is found
-            
-            # If it's a decimal type, keep it as object since pandas doesn't support Decimal natively
-            if pandas_dtype == 'decimal.Decimal':
-                pandas_dtype = 'object'
-            dataframe_data[column_metadata["ColumnName"]] = column_data.astype(pandas_dtype)
-
-        return pd.DataFrame(dataframe_data)
\ No newline at end of file
+    def _decode_columns(self, plans, decimal_mode, max_workers=None, executor='thread', rows=None, dtype_backend='numpy_nullable'):
+        """Decodes the given plans, returning {column name: values}.
+
+        With more than one worker the columns are fanned out over a thread or process pool,
+        largest first so the biggest columns do not end up as stragglers.
+        """
+        if not max_workers or max_workers <= 1 or len(plans) <= 1:
+            return {plan.column_name: self._decode_column(plan, decimal_mode, rows, dtype_backend) for plan in plans}
+
+        columns = {}
+        pending = sorted(plans, key=lambda plan: plan.data_size, reverse=True)
+        if executor == 'thread':
+            # Caching stays transparent: the cache is thread safe
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = {plan.column_name: pool.submit(self._decode_column, plan, decimal_mode, rows, dtype_backend) for plan in pending}
+                return {name: future.result() for name, future in futures.items()}
+
+        # Worker processes only get the column's buffers; cached columns are served here
+        if self.cache is not None:
+            for plan in pending:
+                cached = self._get_cached_column(plan, decimal_mode, rows, dtype_backend)
+                if cached is not None:
+                    columns[plan.column_name] = cached
+            pending = [plan for plan in pending if plan.column_name not in columns]
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                plan.column_name: (plan, pool.submit(
+                    _decode_in_process, plan, plan.idf.read(self._data_model),
+                    plan.dictionary.read(self._data_model) if plan.is_dictionary_encoded else None, decimal_mode, rows, dtype_backend))
+                for plan in pending
+            }
+            for name, (plan, future) in futures.items():
+                column = future.result()
+                if self.cache is not None and rows is None:
+                    column = self.cache.put(('column', plan.table_name, plan.column_name, decimal_mode, dtype_backend), column, int(column.memory_usage(index=False, deep=False)))
+                columns[name] = column
+        return columns
+
+    def _check_filters(self, filters):
+        """Validates filters given as (column, operator, value) tuples."""
+        for predicate in filters:
+            if not isinstance(predicate, (tuple, list)) or len(predicate) != 3:
+                raise ValueError(f"Filters must be (column, operator, value) tuples, got {predicate!r}.")
+            if predicate[1] not in FILTER_OPERATORS:
+                raise ValueError(f"Unsupported filter operator '{predicate[1]}'. Expected one of {FILTER_OPERATORS}.")
+            if predicate[1] in ('in', 'not in') and isinstance(predicate[2], (str, bytes)):
+                raise ValueError(f"Filter operator '{predicate[1]}' expects a collection of values, got {predicate[2]!r}.")
+
+    def _compare(self, values, op, value, column_name):
+        """Evaluates a filter on typed values; nulls never match (as in SQL)."""
+        try:
+            if op in ('in', 'not in'):
+                result = values.isin(list(value))
+                if op == 'not in':
+                    result = ~result & values.notna()
+            else:
+                result = FILTER_COMPARISONS[op](values, value)
+        except TypeError as e:
+            raise ValueError(f"Cannot compare column {column_name} with {value!r}: {e}") from e
+        return pd.Series(result).fillna(False).to_numpy(dtype=bool)
+
+    def _data_id_matcher(self, column, op, value):
+        """Resolves a filter into a predicate over DataIDs, evaluating it once per distinct value.
+
+        Dictionary-encoded columns evaluate it on the dictionary; value-encoded columns on the
+        values of their DataID span when it is small enough, otherwise on the DataIDs they are given.
+        """
+        plan = column.plan
+
+        def evaluate(data_ids):
+            return self._compare(self._data_id_values(plan, data_ids, column.decimal_mode), op, value, plan.column_name)
+
+        if plan.is_dictionary_encoded:
+            # DataIDs outside the dictionary are nulls and never match
+            first, lookup = plan.min_data_id, self._compare(pd.Series(self._converted_dictionary(column, False)), op, value, plan.column_name)
+        elif 0 < plan.max_data_id - plan.min_data_id + 1 <= FILTER_LOOKUP_MAX_SPAN:
+            first, lookup = plan.min_data_id, evaluate(np.arange(plan.min_data_id, plan.max_data_id + 1, dtype=np.int64))
+        else:
+            first, lookup = plan.min_data_id, np.zeros(0, dtype=bool)
+
+        def match(data_ids):
+            data_ids = data_ids.astype(np.int64)
+            inside = (data_ids >= first) & (data_ids < first + len(lookup))
+            result = np.zeros(len(data_ids), dtype=bool)
+            result[inside] = lookup[data_ids[inside] - first]
+            if not plan.is_dictionary_encoded and not inside.all():
+                result[~inside] = evaluate(data_ids[~inside])
+            return result
+
+        return match
+
+    def _select_rows(self, table_name, filters, decimal_mode, row_count):
+        """Returns the positions of the rows matching every filter.
+
+        Each filter column's runs are parsed and matched in the DataID domain; no filter column is
+        materialized.
+        """
+        filter_columns = list(dict.fromkeys(predicate[0] for predicate in filters))
+        open_columns = dict(zip(filter_columns, self._open_columns(self.get_column_plans(table_name, filter_columns), decimal_mode)))
+        mask = np.ones(row_count, dtype=bool)
+        for column_name, op, value in filters:
+            column = open_columns[column_name]
+            matches = self._filter_rows(column.runs, self._data_id_matcher(column, op, value))
+            mask[:len(matches)] &= matches
+            # Rows a column does not cover (shorter segments) cannot match
+            mask[len(matches):] = False
+        return np.flatnonzero(mask)
+
+    def _get_filtered_table(self, table_name, plans, filters, offset, limit, decimal_mode, max_workers, dtype_backend):
+        """Decodes only the rows matching the filters (then offset/limit among them) of the given columns."""
+        self._check_filters(filters)
+        row_count = max((plan.row_count for plan in plans), default=0)
+        selected = self._select_rows(table_name, filters, decimal_mode, row_count)
+        selected = selected[offset:None if limit is None else offset + limit]
+        start, stop = (int(selected[0]), int(selected[-1]) + 1) if len(selected) else (0, 0)
+        dtype_backend = self._budget_dtype_backend(table_name, plans, len(selected), decimal_mode, dtype_backend)
+        open_columns = self._open_columns(plans, decimal_mode, stop, dtype_backend)
+
+        def read(column):
+            # Only the selected rows of the covering range are converted to typed values
+            return self._read_column_rows(column, start, stop, selected - start).reset_index(drop=True)
+
+        if max_workers and max_workers > 1 and len(open_columns) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                decoded = list(pool.map(read, open_columns))
+        else:
+            decoded = [read(column) for column in open_columns]
+        table = pd.DataFrame({plan.column_name: values for plan, values in zip(plans, decoded)})
+        table.index = pd.Index(selected)
+        return table
+
+    def estimate_memory(self, table_name, columns=None, rows=None, decimal_mode='fixed', dtype_backend='numpy_nullable'):
+        """Estimates the bytes get_table would materialize for a table's columns, one row per column.
+
+        The estimate uses row counts and data types from the .idfmeta files, cardinalities from the
+        schema and dictionary file sizes; no column data is read. rows caps the rows per column.
+        """
+        self._check_decimal_mode(decimal_mode)
+        # Estimates need no pyarrow, even for the pyarrow backend
+        self._check_dtype_backend(dtype_backend, require_pyarrow=False)
+        plans = self.get_column_plans(table_name, columns)
+        cardinalities = {name: row['Cardinality'] for name, row in self._get_table_metadata(table_name).items()}
+        return estimate_memory(plans, cardinalities, rows, decimal_mode, dtype_backend)
+
+    def _budget_dtype_backend(self, table_name, plans, rows, decimal_mode, dtype_backend):
+        """Checks a read of rows rows against memory_budget and returns the dtype backend to decode with.
+
+        Over budget, over_budget='categorical' switches to the categorical backend if that fits;
+        otherwise a MemoryError is raised before anything is decoded.
+        """
+        if self.memory_budget is None:
+            return dtype_backend
+        columns = [plan.column_name for plan in plans]
+        needed = int(self.estimate_memory(table_name, columns, rows, decimal_mode, dtype_backend)['Bytes'].sum())
+        if needed <= self.memory_budget:
+            return dtype_backend
+        if self.over_budget == 'categorical' and dtype_backend != 'categorical':
+            categorical = int(self.estimate_memory(table_name, columns, rows, decimal_mode, 'categorical')['Bytes'].sum())
+            if categorical <= self.memory_budget:
+                return 'categorical'
+        raise MemoryError(
+            f"Reading {rows} rows of table {table_name} needs an estimated {needed} bytes, over the memory budget of "
+            f"{self.memory_budget} bytes. Read fewer columns or rows, use dtype_backend='categorical', or stream the "
+            f"table in batches with iter_table."
+        )
+
+    def get_table(self, table_name, columns=None, offset=0, limit=None, decimal_mode='fixed', max_workers=None, executor='thread', dtype_backend='numpy_nullable', filters=None):
+        """Generates a DataFrame representation of the specified table.
+
+        Only the requested columns and rows (and, with filters, only the matching rows) are materialized.
+        """
+        self._check_decimal_mode(decimal_mode)
+        self._check_dtype_backend(dtype_backend)
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unsupported executor '{executor}'. Expected one of {EXECUTORS}.")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("offset and limit must be non-negative.")
+        plans = self.get_column_plans(table_name, columns)
+        if filters:
+            return self._get_filtered_table(table_name, plans, filters, offset, limit, decimal_mode, max_workers, dtype_backend)
+        rows = None if offset == 0 and limit is None else (offset, None if limit is None else offset + limit)
+        row_count = max(max((plan.row_count for plan in plans), default=0) - offset, 0)
+        dtype_backend = self._budget_dtype_backend(table_name, plans, row_count if limit is None else min(row_count, limit), decimal_mode, dtype_backend)
+        decoded = self._decode_columns(plans, decimal_mode, max_workers, executor, rows, dtype_backend)
+
+        # Assemble in schema (or requested) order regardless of the order columns finished in
+        table = pd.DataFrame({plan.column_name: decoded[plan.column_name] for plan in plans})
+        if offset:
+            table.index = pd.RangeIndex(offset, offset + len(table))
+        return table
+
+    def iter_table(self, table_name, batch_rows=100_000, columns=None, decimal_mode='fixed', output='pandas', dtype_backend='numpy_nullable', limit=None):
+        """Yields the table in batches of batch_rows rows, as DataFrames or Arrow record batches.
+
+        Each column's runs are parsed and its dictionary decoded once, then reused for every batch,
+        so only one batch of rows is materialized at a time. Iteration stops after limit rows.
+        """
+        if batch_rows <= 0:
+            raise ValueError("batch_rows must be positive.")
+        if limit is not None and limit < 0:
+            raise ValueError("limit must be non-negative.")
+        self._check_decimal_mode(decimal_mode)
+        if output not in BATCH_OUTPUTS:
+            raise ValueError(f"Unsupported output '{output}'. Expected one of {BATCH_OUTPUTS}.")
+        self._check_dtype_backend(dtype_backend)
+        plans = self.get_column_plans(table_name, columns)
+        open_columns = self._open_columns(plans, decimal_mode, limit, dtype_backend)
+        row_count = max((column.runs.row_count for column in open_columns), default=0)
+        for start in range(0, row_count, batch_rows):
+            stop = min(start + batch_rows, row_count)
+            if output == 'arrow':
+                pa = import_optional('pyarrow', 'Arrow record batches')
+                yield pa.RecordBatch.from_arrays([self._read_column_arrow(column, start, stop) for column in open_columns], names=[plan.column_name for plan in plans])
+            else:
+                batch = pd.DataFrame({column.plan.column_name: self._read_column_rows(column, start, stop) for column in open_columns})
+                batch.index = pd.RangeIndex(start, start + len(batch))
+                yield batch
+
+    def get_table_arrow(self, table_name, columns=None, offset=0, limit=None, decimal_mode='fixed', run_end_encoded=False):
+        """Generates a pyarrow.Table of the specified table without going through pandas rows.
+
+        Dictionary-encoded columns are returned as DictionaryArrays, nulls as validity bitmaps.
+        With run_end_encoded=True every column is a RunEndEncodedArray that keeps the RLE runs.
+        """
+        pa = import_optional('pyarrow', 'Arrow output')
+        self._check_decimal_mode(decimal_mode)
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("offset and limit must be non-negative.")
+        stop = None if limit is None else offset + limit
+        plans = self.get_column_plans(table_name, columns)
+        open_columns = self._open_columns(plans, decimal_mode, stop)
+        read_column = self._read_column_run_end if run_end_encoded else self._read_column_arrow
+        arrays = [read_column(column, offset, stop) for column in open_columns]
+        return pa.Table.from_arrays(arrays, names=[plan.column_name for plan in plans])
+
+    def arrow_schema(self, table_name, columns=None, decimal_mode='fixed'):
+        """Arrow schema of a table's (or the requested) columns as get_table_arrow and iter_table produce them.
+
+        Types come from the column plans; only columns of unmapped data types read their
+        dictionary header to tell strings from numbers. No column data is decoded.
+        """
+        pa = import_optional('pyarrow', 'Arrow output')
+        fields = []
+        for plan in self.get_column_plans(table_name, columns):
+            dictionary_type = None
+            if plan.is_dictionary_encoded and plan.pandas_dtype == 'object':
+                dictionary_type = dictionary_header(plan.dictionary.read_prefix(self._data_model, DICTIONARY_HEADER_SIZE))['DictionaryType']
+            fields.append((plan.column_name, arrow_type(plan, decimal_mode, dictionary_type)))
+        return pa.schema(fields)
+
+    def get_column_codes(self, table_name, column_name, decimal_mode='fixed'):
+        """Returns a dictionary-encoded column as (distinct values, per-row codes), like pandas.factorize.
+
+        Codes are positions in the typed dictionary (-1 for null rows), taken straight from the
+        DataIDs, so rows can be matched against dictionary values without materializing them.
+        """
+        plan, = self.get_column_plans(table_name, [column_name])
+        if not plan.is_dictionary_encoded:
+            raise ValueError(f"Column {column_name} in table {table_name} is not dictionary-encoded.")
+        column, = self._open_columns([plan], decimal_mode)
+        positions, validity = self._dictionary_positions(column)
+        codes = positions.astype(np.int64)
+        if validity is not None:
+            codes[~validity] = -1
+        return pd.Series(self._converted_dictionary(column, False)), codes
+
+    def get_distinct(self, table_name, column_name, sort=False, decimal_mode='fixed'):
+        """Returns the distinct values of a column in DataID order (or sorted), without reading its IDF.
+
+        Dictionary-encoded columns decode only their dictionary. Value-encoded columns take their
+        distinct DataIDs from the hash index (whose hash of an integer DataID is the DataID itself)
+        and convert them with (DataID + BaseId) / Magnitude.
+        """
+        self._check_decimal_mode(decimal_mode)
+        plan, = self.get_column_plans(table_name, [column_name])
+        if plan.is_dictionary_encoded:
+            values = self._convert_values(self._get_dictionary(plan), plan.data_type, decimal_mode)
+        else:
+            data_ids = np.sort(self._read_hash_index(plan).hashes.astype(np.int64))
+            # The null DataID is hashed too; distinct values exclude it like dictionaries do
+            values = self._data_id_values(plan, data_ids[data_ids >= plan.min_data_id], decimal_mode)
+        if sort:
+            values = values.sort_values(na_position='last')
+        return values.reset_index(drop=True).rename(column_name)
+
+    def _value_data_id(self, plan, value, decimal_mode):
+        """DataID a value-encoded column stores a value as, value * Magnitude - BaseId, or None when it has none.
+
+        The DataID is converted back and compared with the value, so values between two DataIDs,
+        values of another type and nulls have none.
+        """
+        try:
+            if plan.data_type == 9:
+                stored = (pd.Timestamp(value) - pd.Timestamp(DATE_ORIGIN)) / pd.Timedelta(days=1)
+            elif plan.data_type == 10 and decimal_mode != 'fixed':
+                stored = float(Decimal(str(value)) * CURRENCY_SCALE)
+            else:
+                stored = float(value)
+            data_id = round(stored * plan.magnitude - plan.base_id)
+        except (TypeError, ValueError, ArithmeticError):
+            return None
+        if data_id < plan.min_data_id or data_id > plan.max_data_id:
+            return None
+        converted = self._data_id_values(plan, np.array([data_id]), decimal_mode)
+        return data_id if self._compare(converted, '==', value, plan.column_name)[0] else None
+
+    def lookup(self, table_name, column_name, value, decimal_mode='fixed'):
+        """Returns the positions of the rows of a column equal to value.
+
+        Value-encoded columns turn the value into its DataID arithmetically and probe only that
+        DataID's bin of the hash index, so a value the column does not hold is answered from the
+        .hidx file without reading the IDF. Dictionary-encoded columns have no hash index in the
+        files and search their dictionary. Matching rows are then found on the RLE runs and bit
+        packed codes without expanding DataIDs.
+        """
+        self._check_decimal_mode(decimal_mode)
+        plan, = self.get_column_plans(table_name, [column_name])
+        if plan.is_dictionary_encoded or plan.hidx is None:
+            column, = self._open_columns([plan], decimal_mode)
+            match = self._data_id_matcher(column, '==', value)
+        else:
+            data_id = self._value_data_id(plan, value, decimal_mode)
+            if data_id is None or self._read_hash_index(plan).find(data_id) is None:
+                return np.zeros(0, dtype=np.int64)
+            column, = self._open_columns([plan], decimal_mode)
+            match = lambda data_ids: data_ids == data_id
+        return np.flatnonzero(self._filter_rows(column.runs, match))
+
+    def get_run_codes(self, table_name, column_name, decimal_mode='fixed'):
+        """Returns a column as (distinct values, code per run, run ends) without expanding RLE runs.
+
+        Codes index the distinct values (-1 for nulls). Dictionary-encoded columns use their
+        dictionary; value-encoded columns get the sorted distinct values of their DataIDs. Only
+        bit packed stretches yield one run per row.
+        """
+        plan, = self.get_column_plans(table_name, [column_name])
+        column, = self._open_columns([plan], decimal_mode)
+        data_ids, run_ends = self._run_end_data_ids(column.runs)
+        data_ids = data_ids.astype(np.int64)
+        if plan.is_dictionary_encoded:
+            values = pd.Series(self._converted_dictionary(column, False))
+            codes = data_ids - plan.min_data_id
+            codes[(codes < 0) | (codes >= len(values))] = -1
+        else:
+            distinct, codes = np.unique(data_ids, return_inverse=True)
+            if plan.has_nulls:
+                # The null DataID sorts first
+                nulls = int(np.count_nonzero(distinct < plan.min_data_id))
+                distinct, codes = distinct[nulls:], codes - nulls
+                codes[codes < 0] = -1
+            values = self._data_id_values(plan, distinct, decimal_mode)
+        return values, codes, run_ends
+
+# ---------- PROCESS POOL WORKER ----------
+
+def _decode_in_process(plan, data_slice, dictionary_buffer, decimal_mode, rows=None, dtype_backend='numpy_nullable'):
+    """Decodes one column from its raw buffers inside a worker process."""
+    decoder = VertiPaqDecoder(None, None)
+    dictionary_series = decoder._parse_dictionary(plan, dictionary_buffer) if dictionary_buffer is not None else None
+    return decoder._decode_buffers(plan, data_slice, dictionary_series, decimal_mode, rows, dtype_backend)
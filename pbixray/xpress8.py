@@ -112,7 +112,7 @@ class Xpress8:
         return output_buffer
 
     @staticmethod
-    def decompress_chunked(input_buffer):
+    def decompress_chunked(input_buffer, max_output=None):
         """
         Decompress a buffer containing multiple compressed chunks.
         Each chunk starts with a 4-byte header:
@@ -121,6 +121,7 @@ class Xpress8:
         
         Args:
             input_buffer (bytes or bytearray): The compressed input data with chunk headers
+            max_output (int, optional): Stop once at least this many bytes are decompressed
             
         Returns:
             bytearray: The fully decompressed data from all chunks
@@ -133,6 +134,9 @@ class Xpress8:
         
         # Process all chunks until end of buffer
         while input_buffer_index < len(input_buffer):
+            if max_output is not None and len(output_buffer) >= max_output:
+                break
+            
             # Ensure we have enough data for the chunk header (4 bytes)
             if input_buffer_index + 4 > len(input_buffer):
                 break
@@ -10,6 +10,11 @@ setup(
         'pandas',
         'apsw'
     ],
+    extras_require={
+        'arrow': ['pyarrow'],
+        'polars': ['polars', 'pyarrow'],
+        'duckdb': ['duckdb', 'pyarrow'],
+    },
     include_package_data=True,
     author="Igor Cotruta",
     description="A Python library to parse and analyze PBIX files used with Microsoft Power BI and Excel PowerPivot.",
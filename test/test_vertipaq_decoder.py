@@ -0,0 +1,615 @@
+import numpy as np
+import pandas as pd
+import pytest
+import re
+import struct
+from dataclasses import replace
+from decimal import Decimal
+from pathlib import Path
+
+from pbixray import PBIXRay
+from pbixray.vertipaq_decoder import VertiPaqDecoder
+
+DATA_DIR = Path(__file__).resolve().parents[1] / 'data'
+RLS_PBIX_PATH = str(DATA_DIR / 'rls-sample-report.pbix')
+EXCALIDRAW_PBIX_PATH = str(DATA_DIR / 'Excalidraw.pbix')
+CUSTOMER_PROFITABILITY_PBIX_PATH = str(DATA_DIR / 'old-Customer-Profitability-Sample-PBIX.pbix')
+SUPPLIER_QUALITY_XLSX_PATH = str(DATA_DIR / 'Supplier Quality Analysis Sample-no-PV.xlsx')
+
+
+def build_idf(runs, codes, bit_width):
+    """Builds a single-segment IDF buffer from (data_value, repeat_value) runs and bit packed codes."""
+    per_word = 64 // bit_width
+    words = []
+    for start in range(0, len(codes), per_word):
+        word = 0
+        for i, code in enumerate(codes[start:start + per_word]):
+            word |= code << (i * bit_width)
+        words.append(word)
+    buffer = struct.pack('<Q', len(runs)) + b''.join(struct.pack('<II', *run) for run in runs)
+    return buffer + struct.pack('<Q', len(words)) + b''.join(struct.pack('<Q', word) for word in words)
+
+
+def record_calls(monkeypatch, target, name):
+    """Wraps target.name so that every call's (args, kwargs) is recorded; returns the list of calls."""
+    original = getattr(target, name)
+    calls = []
+
+    def recording(*args, **kwargs):
+        calls.append((args, kwargs))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(target, name, recording)
+    return calls
+
+
+def record_file_reads(monkeypatch):
+    """Records the names of the files read in full from the data model; returns the (live) list of names."""
+    import pbixray.decode_plan
+    original = pbixray.decode_plan.read_file_range
+    file_names = []
+
+    def recording(data_model, file_name, *args):
+        file_names.append(file_name)
+        return original(data_model, file_name, *args)
+
+    monkeypatch.setattr(pbixray.decode_plan, 'read_file_range', recording)
+    return file_names
+
+
+@pytest.fixture(scope='module')
+def rls_model():
+    return PBIXRay(RLS_PBIX_PATH)
+
+
+def test_fixed_decimal_modes():
+    """Fixed decimal values are kept scaled unless Decimal objects are requested."""
+    decoder = VertiPaqDecoder(None, None)
+    raw = pd.Series([123456.0, np.nan, -5.0])
+
+    fixed = decoder._handle_special_cases(raw, 10, 'fixed')
+    assert str(fixed.dtype) == 'Int64', 'Fixed mode should return scaled Int64 values'
+    assert fixed.tolist()[0] == 123456 and pd.isna(fixed.tolist()[1])
+
+    decimals = decoder._handle_special_cases(raw, 10, 'decimal')
+    assert decimals.tolist() == [Decimal('12.3456'), None, Decimal('-0.0005')], 'Decimal mode should return Decimal objects'
+
+
+def test_fixed_decimal_arrow_mode():
+    pytest.importorskip('pyarrow')
+    decoder = VertiPaqDecoder(None, None)
+    arrow = decoder._handle_special_cases(pd.Series([123456.0, np.nan]), 10, 'arrow')
+    assert str(arrow.dtype) == 'decimal128(19, 4)[pyarrow]'
+    assert arrow.iloc[0] == Decimal('12.3456') and pd.isna(arrow.iloc[1])
+
+
+def test_invalid_decimal_mode(rls_model):
+    with pytest.raises(ValueError):
+        rls_model.get_table('Regions', decimal_mode='float')
+
+
+def test_dictionary_converted_before_expansion(rls_model, monkeypatch):
+    """Datetime conversion runs over the distinct dictionary values, not over every row."""
+    calls = record_calls(monkeypatch, rls_model._vertipaq_decoder, '_convert_values')
+    table = rls_model.get_table('Sales')
+    converted_sizes = [len(args[0]) for args, _ in calls if args[1] == 9]
+
+    assert str(table['SalesDate'].dtype) == 'datetime64[ns]'
+    assert converted_sizes and max(converted_sizes) < len(table), 'Dates should be converted at dictionary level'
+
+
+def test_validity_mask_from_null_data_id():
+    """The null DataID is flagged in the validity mask while RLE runs and bit packed values are expanded."""
+    decoder = VertiPaqDecoder(None, None)
+    # DataID 2 is the null DataID, the dictionary covers DataIDs 3..5; bit packed codes are offset by 2
+    buffer = build_idf([(2, 3), (0xFFFFFFFF, 4), (4, 2)], [1, 0, 3, 2], bit_width=2)
+    data_ids, validity = decoder._read_rle_bit_packed_hybrid(buffer, 4, 2, 2, valid_data_ids=(3, 6))
+
+    assert data_ids.tolist() == [2, 2, 2, 3, 2, 5, 4, 4, 4]
+    assert validity.tolist() == [False, False, False, True, False, True, True, True, True]
+
+    _, validity = decoder._read_rle_bit_packed_hybrid(buffer, 4, 2, 2, valid_data_ids=(2, 6))
+    assert validity is None, 'No validity mask is needed when every DataID is valid'
+
+
+def test_expansion_stops_at_row_count():
+    """Unused primary segment entries past the row count are ignored."""
+    decoder = VertiPaqDecoder(None, None)
+    buffer = build_idf([(3, 2), (0xFFFFFFFF, 2), (7, 0xFFFF0000)], [0, 1], bit_width=1)
+    data_ids, _ = decoder._read_rle_bit_packed_hybrid(buffer, 2, 3, 1, row_count=5)
+    assert data_ids.tolist() == [3, 3, 3, 4, 7]
+
+
+def test_column_plans_are_cached(rls_model):
+    plans = rls_model._vertipaq_decoder.get_column_plans('Sales')
+    again = rls_model._vertipaq_decoder.get_column_plans('Sales')
+    assert all(a is b for a, b in zip(plans, again)), 'Plans should be built once per column'
+    assert [plan.column_name for plan in plans] == list(rls_model.get_table('Sales').columns)
+    assert all(plan.row_count == len(rls_model.get_table('Sales')) for plan in plans)
+    with pytest.raises(AttributeError):
+        plans[0].bit_width = 1
+
+
+def test_column_cache_hits_and_invalidation():
+    model = PBIXRay(RLS_PBIX_PATH, cache_bytes=64 * 1024**2)
+    first = model.get_table('Sales')
+    second = model.get_table('Sales')
+    pd.testing.assert_frame_equal(first, second)
+
+    stats = model.cache_stats
+    assert set(stats['Kind']) == {'dictionary', 'column'}
+    assert (stats.loc[stats['Kind'] == 'column', 'Hits'] == 1).all(), 'Second call should be served from the cache'
+
+    second.iloc[0, 0] = None
+    pd.testing.assert_frame_equal(model.get_table('Sales'), first, obj='Mutating a result must not corrupt the cache')
+
+    model.clear_cache('Sales')
+    assert model.cache_stats.empty
+
+
+def test_column_cache_eviction_and_read_only():
+    from pbixray.column_cache import ColumnCache
+    cache = ColumnCache(max_bytes=100)
+    cache.put(('column', 'T', 'a'), pd.Series(np.arange(8)), 64)
+    cache.put(('column', 'T', 'b'), pd.Series(np.arange(4)), 32)
+    cache.get(('column', 'T', 'a'))
+    cache.put(('column', 'T', 'c'), pd.Series(np.arange(4)), 32)
+
+    assert ('column', 'T', 'b') not in cache, 'Least recently used entry should be evicted'
+    assert cache.nbytes == 96 and cache.evictions == 1
+    cached = cache.get(('column', 'T', 'a'))
+    with pytest.raises(ValueError):
+        cached[0] = 1
+    masked = cache.put(('column', 'T', 'd'), pd.Series([1, None], dtype='Int64'), 4)
+    masked[0] = 5
+    assert cache.get(('column', 'T', 'd')).tolist()[0] == 1
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_parallel_decoding_matches_sequential(rls_model, executor):
+    sequential = rls_model.get_table('Reviews')
+    parallel = rls_model.get_table('Reviews', max_workers=4, executor=executor)
+    pd.testing.assert_frame_equal(parallel, sequential)
+
+
+def test_data_ids_use_narrowest_dtype():
+    decoder = VertiPaqDecoder(None, None)
+    small, _ = decoder._read_rle_bit_packed_hybrid(build_idf([(2, 3), (0xFFFFFFFF, 4)], [1, 0, 3, 2], bit_width=2), 4, 2, 2)
+    assert small.dtype == np.uint8
+
+    wide, _ = decoder._read_rle_bit_packed_hybrid(build_idf([(70000, 2)], [], bit_width=1), 0, 3, 1)
+    assert wide.dtype == np.uint32 and wide.tolist() == [70000, 70000]
+
+
+def test_column_projection(rls_model):
+    full = rls_model.get_table('Sales')
+    columns = [full.columns[2], full.columns[0]]
+    projected = rls_model.get_table('Sales', columns=columns)
+
+    assert list(projected.columns) == columns, 'Requested column order should be kept'
+    pd.testing.assert_frame_equal(projected, full[columns])
+    with pytest.raises(ValueError, match='not found'):
+        rls_model.get_table('Sales', columns=['NoSuchColumn'])
+
+
+def test_row_range_decodes_only_covering_runs():
+    decoder = VertiPaqDecoder(None, None)
+    codes = [i % 4 for i in range(70)]
+    buffer = build_idf([(2, 3), (0xFFFFFFFF, 70), (4, 5)], codes, bit_width=2)
+    full, _ = decoder._read_rle_bit_packed_hybrid(buffer, 70, 2, 2)
+    for start, stop in [(0, 2), (2, 40), (35, 78), (73, 200), (78, 78)]:
+        part, _ = decoder._read_rle_bit_packed_hybrid(buffer, 70, 2, 2, start=start, stop=stop)
+        assert part.tolist() == full[start:stop].tolist()
+
+
+def test_head_and_offset(rls_model):
+    full = rls_model.get_table('Sales')
+    pd.testing.assert_frame_equal(rls_model.head('Sales', 10), full.head(10))
+    pd.testing.assert_frame_equal(rls_model.get_table('Sales', offset=100, limit=25), full.iloc[100:125])
+
+
+def test_iter_table_batches(rls_model, monkeypatch):
+    full = rls_model.get_table('Sales')
+    decoder = rls_model._vertipaq_decoder
+    dictionaries_read = record_calls(monkeypatch, decoder, '_read_dictionary')
+    batches = list(rls_model.iter_table('Sales', batch_rows=100))
+
+    assert [len(batch) for batch in batches] == [100] * 5 + [67]
+    dictionary_columns = [plan for plan in decoder.get_column_plans('Sales') if plan.is_dictionary_encoded]
+    assert len(dictionaries_read) == len(dictionary_columns), 'Dictionaries should be decoded once, not per batch'
+    pd.testing.assert_frame_equal(pd.concat(batches), full)
+
+
+def test_get_table_arrow(rls_model):
+    pa = pytest.importorskip('pyarrow')
+    table = rls_model.get_table_arrow('Sales')
+    table.validate(full=True)
+    expected = rls_model.get_table('Sales')
+
+    assert table.column_names == list(expected.columns)
+    assert any(pa.types.is_dictionary(field.type) for field in table.schema)
+    pd.testing.assert_frame_equal(table.to_pandas().astype(object), expected.astype(object))
+
+
+def test_dictionary_array_nulls():
+    pa = pytest.importorskip('pyarrow')
+    from pbixray.arrow_output import dictionary_array
+    positions = np.array([1, 255, 0, 1], dtype=np.uint8)
+    array = dictionary_array(positions, np.array([True, False, True, True]), pa.array(['a', 'b']))
+    array.validate(full=True)
+    assert array.indices.type == pa.int8() and array.null_count == 1
+    assert array.to_pylist() == ['b', None, 'a', 'b']
+
+
+def test_run_end_encoded_arrow_keeps_runs():
+    pa = pytest.importorskip('pyarrow')
+    model = PBIXRay(EXCALIDRAW_PBIX_PATH)
+    expected = model.get_table_arrow('Fruit_RLE')
+    table = model.get_table_arrow('Fruit_RLE', run_end_encoded=True)
+    table.validate(full=True)
+
+    fruit = table.column('Type').chunk(0)
+    assert pa.types.is_run_end_encoded(fruit.type)
+    assert len(fruit.values) < table.num_rows, 'RLE runs should not be expanded'
+    for name in table.column_names:
+        assert table.column(name).to_pylist() == expected.column(name).to_pylist()
+
+
+def test_run_end_data_ids_merge_bit_packed_values():
+    decoder = VertiPaqDecoder(None, None)
+    buffer = build_idf([(2, 3), (0xFFFFFFFF, 4), (4, 2)], [0, 0, 3, 2], bit_width=2)
+    runs = decoder._prepare_runs(buffer, 4, 2, 2)
+    data_ids, run_ends = decoder._run_end_data_ids(runs)
+    assert data_ids.tolist() == [2, 5, 4]
+    assert run_ends.tolist() == [5, 6, 9]
+
+
+def test_dtype_backends(rls_model):
+    expected = rls_model.get_table('Sales')
+    numpy_table = rls_model.get_table('Sales', dtype_backend='numpy')
+    assert str(numpy_table['Date Key'].dtype) == 'object' and str(numpy_table['SalesID'].dtype) == 'int64'
+    pd.testing.assert_frame_equal(numpy_table.astype(object), expected.astype(object))
+
+    pytest.importorskip('pyarrow')
+    arrow_table = rls_model.get_table('Sales', dtype_backend='pyarrow')
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in arrow_table.dtypes)
+    assert arrow_table['SalesID'].tolist() == expected['SalesID'].tolist()
+
+    with pytest.raises(ValueError):
+        rls_model.get_table('Sales', dtype_backend='arrow')
+
+
+def test_numpy_backend_keeps_masked_dtype_for_nulls():
+    decoder = VertiPaqDecoder(None, None)
+    values = pd.Series([1.0, 2.0])
+    assert str(decoder._convert_values(values, 6, 'fixed', dtype_backend='numpy').dtype) == 'int64'
+    assert str(decoder._convert_values(values, 6, 'fixed', nullable=True, dtype_backend='numpy').dtype) == 'Int64'
+
+
+def test_export_parquet(rls_model, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    file_paths = rls_model.export_parquet(str(tmp_path), tables=['Sales', 'Regions'], row_group_rows=200)
+
+    sales = pq.ParquetFile(file_paths['Sales'])
+    assert sales.metadata.num_row_groups == 3, 'Each decoded batch should become a row group'
+    assert any('DICTIONARY' in str(sales.metadata.row_group(0).column(i).encodings) for i in range(sales.metadata.num_columns))
+    pd.testing.assert_frame_equal(
+        sales.read().to_pandas().astype(object), rls_model.get_table('Sales').astype(object))
+    assert pq.read_table(file_paths['Regions']).num_rows == len(rls_model.get_table('Regions'))
+
+
+def test_export_parquet_fixes_currency_schema(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    pa = pytest.importorskip('pyarrow')
+    model = PBIXRay(RLS_PBIX_PATH)
+    decoder = model._vertipaq_decoder
+    # The sample has no currency columns: read Sales.Amount as one, so batches hold differing decimals
+    amount, = decoder.get_column_plans('Sales', ['Amount'])
+    decoder._plans[('Sales', 'Amount')] = replace(amount, data_type=10)
+
+    file_paths = model.export_parquet(str(tmp_path), tables=['Sales'], columns=['SalesID', 'Amount'], row_group_rows=50, decimal_mode='decimal')
+    sales = pq.ParquetFile(file_paths['Sales'])
+    assert sales.metadata.num_row_groups == 12
+    assert sales.schema_arrow.field('Amount').type == pa.decimal128(19, 4)
+    assert sales.read().column('Amount').to_pylist() == model.get_table('Sales', columns=['Amount'], decimal_mode='decimal')['Amount'].tolist()
+
+
+def test_polars_output_and_scan(rls_model, monkeypatch):
+    pl = pytest.importorskip('polars')
+    pytest.importorskip('pyarrow')
+    frame = rls_model.get_table_polars('Sales')
+    assert frame.schema['Date Key'] == pl.Categorical
+    assert frame['SalesID'].to_list() == rls_model.get_table('Sales')['SalesID'].tolist()
+    assert isinstance(rls_model.get_table_polars('Sales', use_enum=True).schema['Date Key'], pl.Enum)
+
+    calls = record_calls(monkeypatch, rls_model._vertipaq_decoder, 'iter_table')
+    head = rls_model.scan_table('Sales').select('SalesID', 'Date Key').head(5).collect()
+    assert head.to_dicts() == frame.select('SalesID', 'Date Key').head(5).to_dicts()
+    _, kwargs = calls[-1]
+    assert kwargs['columns'] == ['SalesID', 'Date Key'] and kwargs['limit'] == 5, 'Projection and limit should be pushed down'
+
+    # The schema comes from the plans: only the projected column's data is read
+    files_read = record_file_reads(monkeypatch)
+    assert rls_model.scan_table('Sales').select('SalesID').head(3).collect()['SalesID'].to_list() == frame['SalesID'].head(3).to_list()
+    assert {name.rsplit('.', 1)[-1] for name in files_read if 'SalesID' not in name} <= {'idfmeta'}
+
+    # Value-encoded columns of unmapped data types decode to float64
+    model = PBIXRay(CUSTOMER_PROFITABILITY_PBIX_PATH)
+    template = next(name for name in model.tables if name.startswith('DateTableTemplate'))
+    for decimal_mode in ('fixed', 'decimal'):
+        scanned = model.scan_table(template, decimal_mode=decimal_mode).collect()
+        assert scanned.schema['Year'] == pl.Float64 and scanned.height == len(model.get_table(template))
+
+
+def test_duckdb_pushdown(rls_model, monkeypatch):
+    duckdb = pytest.importorskip('duckdb')
+    pytest.importorskip('pyarrow')
+    decoder = rls_model._vertipaq_decoder
+    scans = record_calls(monkeypatch, decoder, 'iter_table')
+    arrow_reads = record_calls(monkeypatch, decoder, 'get_table_arrow')
+    sales = rls_model.get_table('Sales')
+
+    total = rls_model.sql('SELECT sum(Amount) FROM sales WHERE ProductID > 3').fetchone()[0]
+    assert total == sales.loc[sales['ProductID'] > 3, 'Amount'].sum()
+    assert (('Sales',), ['ProductID', 'Amount']) in [(args, kwargs['columns']) for args, kwargs in scans], 'Only the referenced columns should be decoded'
+
+    scans.clear()
+    arrow_reads.clear()
+    rows = rls_model.sql('SELECT amount, salesid FROM sales LIMIT 5 OFFSET 3').fetchall()
+    assert rows == [tuple(row) for row in sales[['Amount', 'SalesID']].iloc[3:8].values.tolist()]
+    assert not scans and [(args, kwargs['columns'], kwargs['limit']) for args, kwargs in arrow_reads] == [(('Sales',), ['Amount', 'SalesID'], 8)], 'LIMIT should be pushed into the decoder'
+
+    # Names that are not columns fail in DuckDB's binder, with or without a pushed-down LIMIT
+    for sql in ('SELECT rowid FROM Sales LIMIT 2', 'SELECT Amout FROM Sales LIMIT 2', 'SELECT Amout FROM Sales'):
+        with pytest.raises(duckdb.BinderException):
+            rls_model.sql(sql).fetchall()
+
+    connection = rls_model.register_duckdb(duckdb.connect(), tables='Regions')
+    assert connection.sql('SELECT count(*) FROM Regions').fetchone()[0] == len(rls_model.get_table('Regions'))
+
+    # Columns of unmapped data types get concrete types from their plans rather than from a zero-row read
+    model = PBIXRay(CUSTOMER_PROFITABILITY_PBIX_PATH)
+    template = next(name for name in model.tables if name.startswith('DateTableTemplate'))
+    expected = model.get_table(template)
+    for decimal_mode in ('fixed', 'decimal'):
+        assert model.sql(f'SELECT count(*), sum(Year) FROM "{template}"', decimal_mode=decimal_mode).fetchone() == (len(expected), expected['Year'].sum())
+
+
+def test_sqlite_virtual_tables(rls_model, monkeypatch):
+    connection = rls_model.sqlite_connection()
+    sales = rls_model.get_table('Sales')
+    assert connection.execute('SELECT count(*), sum(Amount) FROM data.Sales').fetchone() == (len(sales), sales['Amount'].sum())
+    # Metadata in main joins with data in the attached schema
+    names = connection.execute("SELECT c.ExplicitName FROM main.[Column] c JOIN main.[Table] t ON c.TableID = t.ID WHERE t.Name = 'Regions'").fetchall()
+    assert {'RegionID', 'Region'} <= {name for name, in names}
+
+    products = rls_model.get_table('Products')
+    get_table_calls = record_calls(monkeypatch, rls_model._vertipaq_decoder, 'get_table')
+    matching = products['Product'] == 'Smartphone'
+    expected = products.loc[matching, 'ProductID'].tolist()
+    stop = int(products.index[matching][-1]) + 1
+    rows = connection.execute("SELECT ProductID FROM data.Products WHERE Product = 'Smartphone'").fetchall()
+    assert [product_id for product_id, in rows] == expected
+    # The equality is matched on dictionary codes, only the matching row range of the used columns is decoded
+    calls = [(kwargs['columns'], kwargs['offset'], kwargs['limit']) for _, kwargs in get_table_calls]
+    assert sorted(calls) == [(['Product'], 0, stop), (['ProductID'], 0, stop)]
+
+    # A join filters Products once per outer row; decoded columns and matches are reused across Filter calls
+    column_ids = [column_id for column_id, in connection.execute('SELECT ID FROM main.[Column]')]
+    assert len(column_ids) > 100
+    joined = connection.execute('SELECT count(*) FROM main.[Column] c JOIN data.Products p ON p.ProductID = c.ID % 8').fetchone()
+    assert joined == (sum(products['ProductID'].eq(column_id % 8).sum() for column_id in column_ids),)
+    assert len(get_table_calls) <= 4, 'Each column is decoded at most twice: its first row range, then in full'
+
+    # Values are converted row by row as SQLite asks for them
+    selected = sales[sales['ProductID'] == 3]
+    rows = connection.execute('SELECT SalesDate, Amount FROM data.Sales WHERE ProductID = 3').fetchall()
+    assert rows == list(zip(selected['SalesDate'].dt.strftime('%Y-%m-%d %H:%M:%S'), selected['Amount']))
+
+
+def test_filters_pushdown(rls_model, monkeypatch):
+    sales = rls_model.get_table('Sales')
+    filters = [('ProductID', 'in', [3, 5]), ('Amount', '>=', 5000), ('SalesDate', '<', '2022-06-01')]
+    expected = sales[sales['ProductID'].isin([3, 5]) & (sales['Amount'] >= 5000) & (sales['SalesDate'] < '2022-06-01')]
+    assert len(expected) > 0
+    assert rls_model.get_table('Sales', filters=filters).equals(expected)
+    assert rls_model.get_table('Sales', columns=['SalesID'], filters=filters, offset=1, limit=2).equals(expected[['SalesID']].iloc[1:3])
+    assert rls_model.get_table('Sales', filters=[('ProductID', '==', -1)]).empty
+    products = rls_model.get_table('Products')
+    assert rls_model.get_table('Products', filters=[('Product', 'not in', ['Smartphone'])]).equals(products[products['Product'] != 'Smartphone'])
+
+    calls = record_calls(monkeypatch, rls_model._vertipaq_decoder, '_read_column_rows')
+    rls_model.get_table('Sales', filters=filters)
+    selections = [None if args[3] is None else len(args[3]) for args, _ in calls]
+    assert selections == [len(expected)] * len(sales.columns), 'Only matching rows should be materialized'
+
+    with pytest.raises(ValueError):
+        rls_model.get_table('Sales', filters=[('ProductID', 'like', 3)])
+    with pytest.raises(ValueError):
+        rls_model.get_table('Sales', filters=[('Nope', '==', 3)])
+
+
+def test_aggregate_on_runs(rls_model):
+    sales = rls_model.get_table('Sales')
+    result = rls_model.aggregate('Sales', group_by=['RegionID'], aggs={
+        'Rows': ('SalesID', 'COUNT'),
+        'Total': ('Amount', 'SUM'),
+        'First': ('SalesDate', 'min'),
+        'Last': ('Date Key', 'MAX'),
+        'Products': ('ProductID', 'DISTINCTCOUNT'),
+    })
+    expected = sales.groupby('RegionID').agg(
+        Rows=('SalesID', 'count'), Total=('Amount', 'sum'), First=('SalesDate', 'min'),
+        Last=('Date Key', 'max'), Products=('ProductID', 'nunique')).reset_index()
+    assert result['RegionID'].tolist() == expected['RegionID'].tolist()
+    for name in ['Rows', 'Total', 'First', 'Last', 'Products']:
+        assert result[name].tolist() == expected[name].tolist(), name
+
+    totals = rls_model.aggregate('Sales', aggs={'Total': ('Amount', 'SUM'), 'Rows': ('SalesID', 'COUNT')})
+    assert totals.to_dict('records') == [{'Total': sales['Amount'].sum(), 'Rows': len(sales)}]
+    with pytest.raises(ValueError):
+        rls_model.aggregate('Sales', aggs={'Total': ('Date Key', 'SUM')})
+    with pytest.raises(ValueError):
+        rls_model.aggregate('Sales', aggs={'Total': ('Amount', 'AVERAGE')})
+
+
+def test_profile_from_runs(rls_model):
+    sales = rls_model.get_table('Sales')
+    result = rls_model.profile('Sales', columns=['ProductID', 'SalesDate'], top_k=3).set_index('ColumnName')
+    for column in ['ProductID', 'SalesDate']:
+        values = sales[column]
+        row = result.loc[column]
+        assert (row['Rows'], row['Nulls'], row['Distinct']) == (len(values), values.isna().sum(), values.nunique())
+        assert (row['Min'], row['Max']) == (values.min(), values.max())
+        assert [count for _, count in row['TopValues']] == values.value_counts().head(3).tolist()
+        assert row['Error'] is None
+
+    model_profile = rls_model.profile(max_workers=4)
+    assert set(model_profile['TableName']) == set(rls_model.tables)
+    with pytest.raises(ValueError):
+        rls_model.profile(columns=['ProductID'])
+
+
+def test_get_distinct_reads_no_idf(rls_model, monkeypatch):
+    sales = rls_model.get_table('Sales')
+    files_read = record_file_reads(monkeypatch)
+    for column in ['ProductID', 'Amount', 'SalesDate']:
+        distinct = rls_model.get_distinct('Sales', column, sort=True)
+        assert distinct.name == column
+        assert distinct.tolist() == sorted(sales[column].dropna().unique().tolist())
+    assert files_read and not any(name.endswith('.idf') for name in files_read), 'Only dictionaries and hash indexes should be read'
+
+    # Unknown tables are reported as such, not as missing columns or an empty result
+    for call in (lambda: rls_model.get_distinct('Nope', 'x'), lambda: rls_model.lookup('Nope', 'x', 1), lambda: rls_model.estimate_memory('Nope')):
+        with pytest.raises(ValueError, match="Table 'Nope' not found"):
+            call()
+
+
+def test_value_encoded_null_data_id(rls_model):
+    decoder = VertiPaqDecoder(None, None)
+    plan, = rls_model._vertipaq_decoder.get_column_plans('Sales', ['Amount'])
+    # Bit packed code 0 is the null DataID 2 when the segment has nulls
+    plan = replace(plan, min_data_id=3, max_data_id=5, bit_width=2, count_bit_packed=4, row_count=4, base_id=0, magnitude=1, has_nulls=True)
+    values = decoder._decode_buffers(plan, build_idf([(0xFFFFFFFF, 4)], [1, 0, 3, 2], bit_width=2), None)
+    assert str(values.dtype) == 'Int64'
+    assert values.tolist() == [3, pd.NA, 5, 4]
+
+
+def test_value_encoded_nulls_in_sample():
+    model = PBIXRay(CUSTOMER_PROFITABILITY_PBIX_PATH)
+    decoder = model._vertipaq_decoder
+    plan, = decoder.get_column_plans('Customer', ['Postal Code'])
+    assert not plan.is_dictionary_encoded and plan.has_nulls
+    postal_codes = model.get_table('Customer', columns=['Postal Code'])['Postal Code']
+    assert postal_codes.head(8).tolist() == [75038, 60601, 60154, 75024, 76177, pd.NA, 46617, 19087]
+    assert postal_codes.isna().sum() == 50
+
+    # Without the null DataID every value was one too high and the nulls decoded as a value
+    decoder._plans[('Customer', 'Postal Code')] = replace(plan, has_nulls=False)
+    shifted = model.get_table('Customer', columns=['Postal Code'])['Postal Code']
+    assert shifted.head(8).tolist() == [75039, 60602, 60155, 75025, 76178, 1201, 46618, 19088]
+    assert shifted.notna().all()
+
+
+def test_storage_stats_from_headers(rls_model, monkeypatch):
+    decoder = rls_model._vertipaq_decoder
+    files_read = record_file_reads(monkeypatch)
+    stats = rls_model.storage_stats('Sales', max_workers=4).set_index('ColumnName')
+    assert files_read and all(name.endswith('.idfmeta') for name in files_read), 'Only .idfmeta files should be read in full'
+    monkeypatch.undo()
+
+    sales = rls_model.get_table('Sales')
+    assert list(stats.index) == list(sales.columns) and stats['Error'].isna().all()
+    assert (stats['Rows'] == len(sales)).all()
+    for plan in decoder.get_column_plans('Sales'):
+        row = stats.loc[plan.column_name]
+        column, = decoder._open_columns([plan], 'fixed')
+        bit_packed_runs = int(column.runs.bit_packed.sum())
+        assert (row['RLERuns'], row['BitPackedRuns']) == (len(column.runs.bit_packed) - bit_packed_runs, bit_packed_runs)
+        assert (row['BitWidth'], row['CountBitPacked'], row['MinDataId']) == (plan.bit_width, plan.count_bit_packed, plan.min_data_id)
+        if plan.is_dictionary_encoded:
+            assert row['DictionaryEntries'] == len(decoder._get_dictionary(plan))
+    assert stats.loc['RegionID', 'DictionaryType'] == 'long' and pd.isna(stats.loc['Amount', 'DictionaryType'])
+    with pytest.raises(ValueError):
+        rls_model.storage_stats('Nope')
+
+
+def test_memory_report_classifies_file_log(rls_model):
+    files = rls_model.memory_report(level='file')
+    assert len(files) == len(rls_model._data_model.file_log)
+    assert files['Size'].sum() == rls_model.size and files['Percent'].sum() == pytest.approx(100)
+
+    columns = rls_model.memory_report().set_index(['TableName', 'ObjectName'])
+    assert columns['Total'].sum() == rls_model.size
+    statistics = rls_model.statistics.set_index(['TableName', 'ColumnName'])
+    for key, row in statistics.iterrows():
+        assert (columns.loc[key, 'Dictionary'], columns.loc[key, 'HashIndex']) == (row['Dictionary'], row['HashIndex'])
+        # Data also counts the .idfmeta
+        assert columns.loc[key, 'Data'] > row['DataSize']
+        assert columns.loc[key, 'AttributeHierarchy'] > 0
+    assert set(columns.loc['Sales']['ObjectType']) == {'Column', 'RowNumber', 'Relationship'}
+    assert columns.loc[('Sales', 'RowNumber'), 'Data'] > 0
+
+    tables = rls_model.memory_report(level='table').set_index('TableName')
+    assert tables.loc['Sales', 'Relationship'] > 0 and tables.loc['_Measures', 'Total'] > 0
+    assert tables.loc['Sales', 'Total'] == columns.loc['Sales', 'Total'].sum()
+    with pytest.raises(ValueError):
+        rls_model.memory_report(level='segment')
+
+
+def test_memory_report_classifies_xlsx_metadata():
+    files = PBIXRay(SUPPLIER_QUALITY_XLSX_PATH).memory_report(level='file')
+    # Every file named after a table (data, hierarchies and the .xml object metadata) belongs to it
+    table_stems = {stem for name in files['FileName'] for stem in re.findall(r'[HRU]\$(.+?)\$', name)}
+    unassigned = files.loc[files['TableName'].isna(), 'FileName']
+    assert table_stems and not [name for name in unassigned if any(stem in name for stem in table_stems)]
+
+    metadata = files[files['FileName'].str.endswith('.xml') & files['TableName'].notna()].set_index('FileName')
+    assert tuple(metadata.loc['Vendor_2df0e7da-f463-4f68-a14f-0beeffc54b37.178.det.xml', ['TableName', 'ObjectType', 'Structure']]) == ('Vendor', 'Table', 'Other')
+    assert tuple(metadata.loc['H$Vendor_2df0e7da-f463-4f68-a14f-0beeffc54b37$Vendor ID.8.tbl.xml', ['TableName', 'ObjectName', 'Structure']]) == ('Vendor', 'Vendor ID', 'AttributeHierarchy')
+
+
+def test_estimate_memory_and_budget(rls_model):
+    sales = rls_model.get_table('Sales')
+    categorical = rls_model.get_table('Sales', dtype_backend='categorical')
+    assert str(categorical['ProductID'].dtype) == 'category'
+    pd.testing.assert_frame_equal(categorical.astype(object), sales.astype(object))
+
+    estimate = rls_model.estimate_memory('Sales').set_index('ColumnName')
+    assert list(estimate.index) == list(sales.columns) and (estimate['Rows'] == len(sales)).all()
+    # Fixed-width columns are estimated exactly
+    for column in ('SalesID', 'SalesDate', 'Amount'):
+        assert estimate.loc[column, 'Bytes'] == sales[column].memory_usage(index=False)
+    dates = rls_model.estimate_memory('DateTable')['Bytes'].sum()
+    assert rls_model.estimate_memory('DateTable', dtype_backend='categorical')['Bytes'].sum() < dates / 4
+
+    limited = PBIXRay(RLS_PBIX_PATH, memory_budget=dates // 2)
+    with pytest.raises(MemoryError, match='iter_table'):
+        limited.get_table('DateTable')
+    assert len(limited.get_table('DateTable', limit=10)) == 10
+    switching = PBIXRay(RLS_PBIX_PATH, memory_budget=dates // 2, over_budget='categorical')
+    assert str(switching.get_table('DateTable').iloc[:, 0].dtype) == 'category'
+    with pytest.raises(ValueError):
+        PBIXRay(RLS_PBIX_PATH, over_budget='stream')
+
+
+def test_lookup_probes_hash_index(rls_model, monkeypatch):
+    decoder = rls_model._vertipaq_decoder
+    plan, = decoder.get_column_plans('Sales', ['Amount'])
+    index = decoder._read_hash_index(plan)
+    assert len(index.hashes) == index.record_count
+    assert all(index.find(int(hash_value)) == int(key) for hash_value, key in zip(index.hashes, index.keys))
+
+    sales = rls_model.get_table('Sales')
+    for column in ['Amount', 'SalesDate', 'ProductID']:
+        for value in sales[column].dropna().unique()[:5]:
+            expected = np.flatnonzero((sales[column] == value).to_numpy(dtype=bool, na_value=False))
+            np.testing.assert_array_equal(rls_model.lookup('Sales', column, value), expected)
+
+    # Review ids have gaps within their DataID span
+    present = set(rls_model.get_table('Reviews', columns=['ReviewID'])['ReviewID'].tolist())
+    missing = next(value for value in range(min(present), max(present)) if value not in present)
+    files_read = record_file_reads(monkeypatch)
+    assert len(rls_model.lookup('Reviews', 'ReviewID', missing)) == 0
+    assert len(rls_model.lookup('Sales', 'Amount', 'not a number')) == 0
+    assert files_read and not any(name.endswith('.idf') for name in files_read), 'Absent values should be answered from the hash index'